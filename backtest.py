@@ -0,0 +1,151 @@
+# app/models/backtest.py
+
+from typing import Dict, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import numpy as np
+import pandas as pd
+from tensorflow.keras.models import load_model
+from app.models.predictor import PricePredictor
+
+
+def make_windows(closes: np.ndarray, input_steps: int, forecast_steps: int):
+    """Return every (input, target) window of ``closes`` as zero-copy strided views."""
+    windows = np.lib.stride_tricks.sliding_window_view(closes, input_steps + forecast_steps)
+    return windows[:, :input_steps], windows[:, input_steps:]
+
+
+def predict_fold(model, closes: np.ndarray, start: int, stop: int, input_steps: int,
+                 forecast_steps: int, batch_size: int) -> np.ndarray:
+    """Predict windows ``start:stop``, each min-max scaled on the history up to its last input.
+
+    As in serving, the scale covers everything seen so far, but no window sees a close
+    after its last input, so results do not depend on how windows are split into folds.
+    """
+    X, _ = make_windows(closes, input_steps, forecast_steps)
+    low = np.minimum.accumulate(closes)[input_steps - 1:][start:stop, None]
+    high = np.maximum.accumulate(closes)[input_steps - 1:][start:stop, None]
+    # Like MinMaxScaler, a constant history gets a unit range instead of dividing by zero.
+    span = np.where(high > low, high - low, 1.0)
+    X = ((X[start:stop] - low) / span).reshape(-1, input_steps, 1)
+    predictions = model.predict(X, batch_size=batch_size, verbose=0).reshape(-1, forecast_steps)
+    return predictions * span + low
+
+
+_worker_model = None
+
+
+def _load_worker_model(model_path: str):
+    # Keras models cannot be pickled, so every worker process loads its own copy once.
+    global _worker_model
+    _worker_model = load_model(model_path)
+
+
+def _predict_fold_worker(*args) -> np.ndarray:
+    return predict_fold(_worker_model, *args)
+
+
+def file_hash(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(8192):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class Backtester:
+    def __init__(self, predictor: PricePredictor, batch_size: int = 1024,
+                 cache_dir: str = "app/models/backtests"):
+        self.predictor = predictor
+        self.batch_size = batch_size
+        self.cache_dir = cache_dir
+
+    def model_version(self) -> Optional[str]:
+        # Results are cached under the saved file, so unsaved in-memory weights are not cacheable.
+        if not os.path.exists(self.predictor.model_path):
+            return None
+        if self.predictor.saved_version != self.predictor.model_version:
+            return None
+        return file_hash(self.predictor.model_path)
+
+    def cache_path(self, closes: np.ndarray, folds: int) -> Optional[str]:
+        version = self.model_version()
+        if version is None:
+            return None
+        hasher = hashlib.sha256(closes.tobytes())
+        # The scaling tag keeps results cached under the earlier per-fold scaling from being reused.
+        hasher.update(f"{self.predictor.input_steps}:{self.predictor.forecast_steps}:{folds}:expanding".encode())
+        return os.path.join(self.cache_dir, version[:16], f"{hasher.hexdigest()[:16]}.json")
+
+    def run(self, df: pd.DataFrame, folds: int = 1, workers: int = 1, use_cache: bool = True) -> Dict[str, Any]:
+        """Replay ``df`` window by window and report error metrics per forecast step.
+
+        Windows are split into ``folds`` contiguous walk-forward folds, each predicted with
+        one batched ``model.predict`` call. With ``workers > 1`` folds run in separate
+        processes, which requires the model to be saved at ``predictor.model_path``.
+        """
+        if not self.predictor.model:
+            raise ValueError("Model is not loaded.")
+        input_steps, forecast_steps = self.predictor.input_steps, self.predictor.forecast_steps
+        closes = df['close'].to_numpy(dtype=np.float64)
+        n_windows = len(closes) - input_steps - forecast_steps + 1
+        if n_windows <= 0:
+            raise ValueError("Insufficient data for backtesting.")
+        folds = max(1, min(folds, n_windows))
+
+        cache_path = self.cache_path(closes, folds) if use_cache else None
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, "r") as f:
+                logging.info(f"Loaded cached backtest results from {cache_path}.")
+                return json.load(f)
+
+        bounds = np.linspace(0, n_windows, folds + 1).astype(int)
+        fold_ranges = list(zip(bounds[:-1], bounds[1:]))
+        if workers > 1:
+            if not os.path.exists(self.predictor.model_path):
+                raise FileNotFoundError(f"Model file not found at {self.predictor.model_path}.")
+            # Spawn rather than fork: forking a process with an initialized TensorFlow runtime can deadlock.
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_load_worker_model,
+                                     initargs=(self.predictor.model_path,)) as executor:
+                futures = [
+                    executor.submit(_predict_fold_worker, closes, start, stop,
+                                    input_steps, forecast_steps, self.batch_size)
+                    for start, stop in fold_ranges
+                ]
+                fold_predictions = [future.result() for future in futures]
+        else:
+            fold_predictions = [
+                predict_fold(self.predictor.model, closes, start, stop, input_steps, forecast_steps, self.batch_size)
+                for start, stop in fold_ranges
+            ]
+
+        _, targets = make_windows(closes, input_steps, forecast_steps)
+        results = self.compute_metrics(np.concatenate(fold_predictions), targets)
+        results['folds'] = [
+            self.compute_metrics(fold, targets[start:stop])
+            for fold, (start, stop) in zip(fold_predictions, fold_ranges)
+        ]
+        logging.info(f"Backtested {n_windows} windows in {folds} folds.")
+
+        if cache_path:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, "w") as f:
+                json.dump(results, f)
+        return results
+
+    @staticmethod
+    def compute_metrics(predictions: np.ndarray, targets: np.ndarray) -> Dict[str, Any]:
+        errors = predictions - targets
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ape = np.abs(errors) / np.abs(targets)
+        return {
+            'windows': int(len(targets)),
+            'mae': np.abs(errors).mean(axis=0).tolist(),
+            'rmse': np.sqrt((errors ** 2).mean(axis=0)).tolist(),
+            'mape': np.nanmean(np.where(np.isfinite(ape), ape, np.nan), axis=0).tolist(),
+        }
@@ -0,0 +1,202 @@
+# app/gui/chart.py
+
+from typing import Tuple
+import numpy as np
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, QObject, QThread, QPointF, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QPainter, QPen, QColor, QPolygonF
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Largest-Triangle-Three-Buckets downsampling of ``(x, y)`` to ``n_out`` points."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[anchor] - next_x) * (y[lo:hi] - y[anchor]) - (x[anchor] - x[lo:hi]) * (next_y - y[anchor]))
+        anchor = lo + int(np.argmax(area))
+        selected[i + 1] = anchor
+    return x[selected], y[selected]
+
+
+class StreamingDecimator:
+    """Incremental LTTB: new points are decimated bucket by bucket as they arrive.
+
+    Buckets already decimated are never revisited; once the output exceeds ``threshold``
+    it is halved with LTTB and the bucket size doubles, keeping the output bounded. A batch
+    larger than ``threshold`` (e.g. the first history load) is decimated in one LTTB pass.
+    """
+
+    def __init__(self, threshold: int = 2000):
+        self.threshold = threshold
+        self.bucket_size = 1
+        self.sealed_x, self.sealed_y = np.empty(0), np.empty(0)
+        self.tail_x, self.tail_y = np.empty(0), np.empty(0)
+        # Last two raw timestamps, so the candle interval survives decimation.
+        self.raw_x = np.empty(0)
+
+    def interval(self) -> float:
+        return self.raw_x[-1] - self.raw_x[-2] if len(self.raw_x) == 2 else np.nan
+
+    def last_x(self) -> float:
+        if len(self.tail_x):
+            return self.tail_x[-1]
+        return self.sealed_x[-1] if len(self.sealed_x) else -np.inf
+
+    def extend(self, x: np.ndarray, y: np.ndarray):
+        # Only points newer than what has been seen are appended.
+        new = x > self.last_x()
+        self.tail_x = np.concatenate([self.tail_x, x[new]])
+        self.tail_y = np.concatenate([self.tail_y, y[new]])
+        self.raw_x = np.concatenate([self.raw_x, x[new]])[-2:]
+        if not len(self.sealed_x) and len(self.tail_x):
+            self.sealed_x, self.sealed_y = self.tail_x[:1], self.tail_y[:1]
+            self.tail_x, self.tail_y = self.tail_x[1:], self.tail_y[1:]
+
+        if not len(self.sealed_x):
+            return
+
+        if len(self.tail_x) > self.threshold:
+            # Bucket size stays a power of two so later halvings line up with it.
+            self.bucket_size = max(self.bucket_size, 1 << int(np.ceil(np.log2(2 * len(self.tail_x) / self.threshold))))
+            n_buckets = len(self.tail_x) // self.bucket_size
+            cut = n_buckets * self.bucket_size
+            bx, by = lttb(np.concatenate([self.sealed_x[-1:], self.tail_x[:cut]]),
+                          np.concatenate([self.sealed_y[-1:], self.tail_y[:cut]]), n_buckets + 1)
+            self.sealed_x = np.concatenate([self.sealed_x, bx[1:]])
+            self.sealed_y = np.concatenate([self.sealed_y, by[1:]])
+            self.tail_x, self.tail_y = self.tail_x[cut:], self.tail_y[cut:]
+
+        size = self.bucket_size
+        selected_x, selected_y = [], []
+        anchor_x, anchor_y = self.sealed_x[-1], self.sealed_y[-1]
+        start = 0
+        while len(self.tail_x) - start >= 2 * size:
+            bx, by = self.tail_x[start:start + size], self.tail_y[start:start + size]
+            next_x = self.tail_x[start + size:start + 2 * size].mean()
+            next_y = self.tail_y[start + size:start + 2 * size].mean()
+            area = np.abs((anchor_x - next_x) * (by - anchor_y) - (anchor_x - bx) * (next_y - anchor_y))
+            best = int(np.argmax(area))
+            anchor_x, anchor_y = bx[best], by[best]
+            selected_x.append(anchor_x)
+            selected_y.append(anchor_y)
+            start += size
+        if selected_x:
+            self.sealed_x = np.concatenate([self.sealed_x, selected_x])
+            self.sealed_y = np.concatenate([self.sealed_y, selected_y])
+            self.tail_x, self.tail_y = self.tail_x[start:], self.tail_y[start:]
+        if len(self.sealed_x) > self.threshold:
+            self.sealed_x, self.sealed_y = lttb(self.sealed_x, self.sealed_y, self.threshold // 2)
+            self.bucket_size *= 2
+
+    def points(self) -> Tuple[np.ndarray, np.ndarray]:
+        # The undecimated tail spans at most two buckets; it gets a small share of the budget.
+        tail_x, tail_y = lttb(self.tail_x, self.tail_y, self.threshold // 10 + 2)
+        return np.concatenate([self.sealed_x, tail_x]), np.concatenate([self.sealed_y, tail_y])
+
+
+class DecimationWorker(QObject):
+    points_ready = pyqtSignal(object, object, float)
+
+    def __init__(self, threshold: int = 2000):
+        super().__init__()
+        self.decimator = StreamingDecimator(threshold)
+
+    @pyqtSlot()
+    def reset(self):
+        self.decimator = StreamingDecimator(self.decimator.threshold)
+
+    @pyqtSlot(object, object)
+    def add_points(self, x: np.ndarray, y: np.ndarray):
+        self.decimator.extend(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+        self.points_ready.emit(*self.decimator.points(), self.decimator.interval())
+
+
+class PriceChart(QWidget):
+    """Line chart of price history plus forecast; decimation runs on a worker thread."""
+
+    points_added = pyqtSignal(object, object)
+    reset_requested = pyqtSignal()
+
+    def __init__(self, parent=None, threshold: int = 2000):
+        super().__init__(parent)
+        self.history_x, self.history_y = np.empty(0), np.empty(0)
+        self.interval = np.nan
+        self.predictions = []
+
+        self.worker_thread = QThread(self)
+        self.worker = DecimationWorker(threshold)
+        self.worker.moveToThread(self.worker_thread)
+        self.points_added.connect(self.worker.add_points)
+        self.reset_requested.connect(self.worker.reset)
+        self.worker.points_ready.connect(self.set_history)
+        self.worker_thread.start()
+
+    def add_candles(self, timestamps: np.ndarray, closes: np.ndarray):
+        self.points_added.emit(timestamps, closes)
+
+    def last_timestamp(self):
+        # The decimated output always keeps the latest point, so this is the newest candle shown.
+        return int(self.history_x[-1]) if len(self.history_x) else None
+
+    def reset(self):
+        self.history_x, self.history_y = np.empty(0), np.empty(0)
+        self.interval = np.nan
+        self.predictions = []
+        self.reset_requested.emit()
+        self.update()
+
+    def set_history(self, x: np.ndarray, y: np.ndarray, interval: float):
+        self.history_x, self.history_y = x, y
+        self.interval = interval
+        self.update()
+
+    def set_forecast(self, predictions: list):
+        self.predictions = predictions
+        self.update()
+
+    def forecast(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Forecast steps continue the raw candle interval from the latest close.
+        if not self.predictions or np.isnan(self.interval):
+            return np.empty(0), np.empty(0)
+        forecast_x = self.history_x[-1] + self.interval * np.arange(len(self.predictions) + 1)
+        return forecast_x, np.concatenate([[self.history_y[-1]], self.predictions])
+
+    def stop(self):
+        self.worker_thread.quit()
+        self.worker_thread.wait()
+
+    def polygon(self, x: np.ndarray, y: np.ndarray, bounds: Tuple[float, float, float, float]) -> QPolygonF:
+        x_min, x_max, y_min, y_max = bounds
+        px = (x - x_min) / max(x_max - x_min, 1e-9) * (self.width() - 1)
+        py = (1 - (y - y_min) / max(y_max - y_min, 1e-9)) * (self.height() - 1)
+        return QPolygonF([QPointF(a, b) for a, b in zip(px, py)])
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(255, 255, 255))
+        if len(self.history_x) < 2:
+            painter.drawText(self.rect(), Qt.AlignCenter, "No price history yet.")
+            return
+        forecast_x, forecast_y = self.forecast()
+        xs = np.concatenate([self.history_x, forecast_x])
+        ys = np.concatenate([self.history_y, forecast_y])
+        bounds = (xs.min(), xs.max(), ys.min(), ys.max())
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(QColor(30, 90, 200), 1))
+        painter.drawPolyline(self.polygon(self.history_x, self.history_y, bounds))
+        if len(forecast_x):
+            painter.setPen(QPen(QColor(220, 80, 30), 2, Qt.DashLine))
+            painter.drawPolyline(self.polygon(forecast_x, forecast_y, bounds))
+        painter.setPen(QColor(80, 80, 80))
+        painter.drawText(4, 14, f"{bounds[3]:.2f}")
+        painter.drawText(4, self.height() - 4, f"{bounds[2]:.2f}")
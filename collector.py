@@ -1,9 +1,11 @@
 # app/data/collector.py
 
 import asyncio
-from typing import Dict, List
+import time
+from typing import Dict, List, Optional
 import ccxt.async_support as ccxt
 import logging
+from app.data.resampler import TIMEFRAMES
 
 
 class DataCollector:
@@ -20,25 +22,40 @@ class DataCollector:
         logging.info("Exchanges initialized for data collection.")
         return exchanges
 
-    async def fetch_data(self, exchange_name: str, symbol: str) -> List[List[float]]:
+    async def fetch_data(self, exchange_name: str, symbol: str, timeframe: str = '1h',
+                         since: Optional[int] = None, max_pages: int = 50) -> List[List[float]]:
         exchange = self.exchanges.get(exchange_name)
         if not exchange:
             logging.error(f"Exchange '{exchange_name}' not supported.")
             return []
         try:
-            ohlcv = await exchange.fetch_ohlcv(symbol, timeframe='1h')
+            if since is None:
+                ohlcv = await exchange.fetch_ohlcv(symbol, timeframe=timeframe)
+            else:
+                # Page forward from `since` until the latest candle has been fetched.
+                ohlcv = []
+                latest = int(time.time() * 1000) - 2 * TIMEFRAMES[timeframe]
+                for _ in range(max_pages):
+                    page = [c for c in await exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since)
+                            if c[0] >= since]
+                    if not page:
+                        break
+                    ohlcv += page
+                    since = page[-1][0] + 1
+                    if page[-1][0] >= latest:
+                        break
             logging.info(f"Fetched data for {symbol} from {exchange_name}.")
             return ohlcv
         except Exception as e:
             logging.error(f"Error fetching data from {exchange_name} for {symbol}: {e}")
             return []
 
-    async def collect_all_data(self) -> Dict[str, List[List[float]]]:
+    async def collect_all_data(self, timeframe: str = '1h', since: Optional[int] = None) -> Dict[str, List[List[float]]]:
         tasks = []
         symbols = ['BTC/USD', 'ETH/USD']  # Extend symbols as needed
         for exchange_name in self.exchanges.keys():
             for symbol in symbols:
-                tasks.append(self.fetch_data(exchange_name, symbol))
+                tasks.append(self.fetch_data(exchange_name, symbol, timeframe, since))
         results = await asyncio.gather(*tasks, return_exceptions=True)
         data = {}
         for idx, result in enumerate(results):
@@ -0,0 +1,97 @@
+# app/api/export.py
+
+import io
+import json
+from typing import Dict, Iterator
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional format
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional format
+    pa = None
+
+MEDIA_TYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'msgpack': 'application/x-msgpack',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+def chunk_rows(chunk: Dict[str, list]) -> list:
+    columns = list(chunk)
+    return [dict(zip(columns, values)) for values in zip(*chunk.values())]
+
+
+def encode_json(chunks: Iterator[Dict[str, list]]) -> Iterator[bytes]:
+    """One JSON array of row objects, serialized one chunk at a time."""
+    yield b'['
+    first = True
+    for chunk in chunks:
+        rows = chunk_rows(chunk)
+        if not rows:
+            continue
+        body = dumps(rows)[1:-1]
+        yield body if first else b',' + body
+        first = False
+    yield b']'
+
+
+def encode_ndjson(chunks: Iterator[Dict[str, list]]) -> Iterator[bytes]:
+    for chunk in chunks:
+        yield b''.join(dumps(row) + b'\n' for row in chunk_rows(chunk))
+
+
+def encode_msgpack(chunks: Iterator[Dict[str, list]]) -> Iterator[bytes]:
+    """A stream of concatenated MessagePack maps, each holding one columnar chunk."""
+    for chunk in chunks:
+        yield msgpack.packb(chunk)
+
+
+def encode_arrow(chunks: Iterator[Dict[str, list]]) -> Iterator[bytes]:
+    """An Arrow IPC stream with one record batch per chunk."""
+    sink = io.BytesIO()
+    writer = None
+    for chunk in chunks:
+        batch = pa.RecordBatch.from_pydict(chunk)
+        if writer is None:
+            writer = pa.ipc.new_stream(sink, batch.schema)
+        writer.write_batch(batch)
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+    if writer is not None:
+        writer.close()
+        yield sink.getvalue()
+
+
+ENCODERS = {
+    'json': encode_json,
+    'ndjson': encode_ndjson,
+    'msgpack': encode_msgpack,
+    'arrow': encode_arrow,
+}
+
+
+def check_format(fmt: str):
+    if fmt not in ENCODERS:
+        raise ValueError(f"Unsupported export format '{fmt}'.")
+    if fmt == 'msgpack' and msgpack is None:
+        raise ValueError("The msgpack export format requires the 'msgpack' package.")
+    if fmt == 'arrow' and pa is None:
+        raise ValueError("The arrow export format requires the 'pyarrow' package.")
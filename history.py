@@ -0,0 +1,104 @@
+# app/data/history.py
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+TABLE_COLUMNS = {
+    'candles': ['key', 'timeframe', 'timestamp', 'open', 'high', 'low', 'close', 'volume'],
+    'predictions': ['key', 'timeframe', 'timestamp', 'step', 'value', 'created_at'],
+}
+
+
+class HistoryStore:
+    """SQLite store of collected candles and served predictions, read back in columnar chunks."""
+
+    def __init__(self, path: str = "app/data/history.db"):
+        self.lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS candles (key TEXT, timeframe TEXT, timestamp INTEGER, open REAL,"
+            " high REAL, low REAL, close REAL, volume REAL, PRIMARY KEY (key, timeframe, timestamp)) WITHOUT ROWID"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS predictions (key TEXT, timeframe TEXT, timestamp INTEGER, step INTEGER,"
+            " value REAL, created_at REAL, PRIMARY KEY (key, timeframe, timestamp, step)) WITHOUT ROWID"
+        )
+
+    def add_candles(self, raw_data: Dict[str, List[List[float]]], timeframe: str):
+        """Store candles outside the range already held per key.
+
+        Candles from the stored tail onward are written (the tail may still be an open candle),
+        as are backfilled candles older than the stored head; everything in between is skipped.
+        """
+        with self.lock:
+            bounds = {key: (head, tail) for key, head, tail in self.connection.execute(
+                "SELECT key, MIN(timestamp), MAX(timestamp) FROM candles WHERE timeframe = ? GROUP BY key", (timeframe,)
+            )}
+        rows = []
+        for key, ohlcv in raw_data.items():
+            head, tail = bounds.get(key, (None, None))
+            rows += [(key, timeframe, int(c[0]), c[1], c[2], c[3], c[4], c[5]) for c in ohlcv
+                     if tail is None or int(c[0]) >= tail or int(c[0]) < head]
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        logging.info(f"Stored {len(rows)} {timeframe} candles.")
+
+    def add_prediction(self, key: str, timeframe: str, timestamp: int, predictions: List[float]):
+        created_at = time.time()
+        rows = [(key, timeframe, int(timestamp), step + 1, value, created_at) for step, value in enumerate(predictions)]
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def iter_chunks(self, table: str, timeframe: str, keys: Optional[List[str]] = None, start: Optional[int] = None,
+                    end: Optional[int] = None, chunk_size: int = 10000,
+                    key_prefix: Optional[str] = None) -> Iterator[Dict[str, list]]:
+        """Yield ``{column: values}`` chunks of ``table`` ordered by key and time.
+
+        ``key_prefix`` limits the export to keys starting with it (e.g. one exchange's ``binance_``).
+        Pages with keyset pagination so each chunk is an indexed range scan; at least one
+        (possibly empty) chunk is always yielded.
+        """
+        columns = TABLE_COLUMNS[table]
+        order = ['key', 'timestamp', 'step'] if table == 'predictions' else ['key', 'timestamp']
+        where, params = ["timeframe = ?"], [timeframe]
+        if keys:
+            where.append(f"key IN ({', '.join('?' * len(keys))})")
+            params += keys
+        if key_prefix:
+            # A key range instead of LIKE, where '_' would be a wildcard; it also uses the index.
+            where.append("key >= ? AND key < ?")
+            params += [key_prefix, key_prefix[:-1] + chr(ord(key_prefix[-1]) + 1)]
+        if start is not None:
+            where.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            where.append("timestamp < ?")
+            params.append(end)
+
+        cursor_position, yielded = None, False
+        while True:
+            page_where = list(where)
+            page_params = list(params)
+            if cursor_position is not None:
+                page_where.append(f"({', '.join(order)}) > ({', '.join('?' * len(order))})")
+                page_params += cursor_position
+            query = (f"SELECT {', '.join(columns)} FROM {table} WHERE {' AND '.join(page_where)}"
+                     f" ORDER BY {', '.join(order)} LIMIT ?")
+            with self.lock:
+                rows = self.connection.execute(query, page_params + [chunk_size]).fetchall()
+            if not rows and yielded:
+                return
+            yield dict(zip(columns, map(list, zip(*rows)))) if rows else {column: [] for column in columns}
+            yielded = True
+            if len(rows) < chunk_size:
+                return
+            last = dict(zip(columns, rows[-1]))
+            cursor_position = [last[column] for column in order]
@@ -0,0 +1,169 @@
+# app/data/indicators.py
+
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+# Feature spec: indicator kind -> list of windows (MACD takes (fast, slow, signal) tuples).
+DEFAULT_FEATURE_SPEC = {
+    'ma': [10, 15, 20],
+    'ema': [10, 15, 20],
+    'rsi': [14],
+    'macd': [(12, 26, 9)],
+    'bollinger': [20],
+    'atr': [14],
+    'volume': [20],
+}
+
+INDICATOR_KINDS = set(DEFAULT_FEATURE_SPEC)
+
+
+def stack_frames(frames: Dict[str, pd.DataFrame], columns: List[str]) -> Dict[str, np.ndarray]:
+    """Stack the columns of every frame into (symbols x time) arrays, right-aligned and NaN-padded."""
+    length = max(len(df) for df in frames.values())
+    arrays = {column: np.full((len(frames), length), np.nan) for column in columns}
+    for s_idx, df in enumerate(frames.values()):
+        if len(df) == 0:
+            continue
+        for column in columns:
+            arrays[column][s_idx, length - len(df):] = df[column].to_numpy(dtype=np.float64)
+    return arrays
+
+
+def rolling_sums(values: np.ndarray, windows: List[int],
+                 squares: bool = True) -> Dict[int, Tuple[np.ndarray, Optional[np.ndarray]]]:
+    """Rolling sums of ``values`` and ``values**2`` for every window from one shared cumulative sum.
+
+    Windows that overlap a NaN (padding or missing data) are NaN. Sums of squares are
+    ``None`` when ``squares`` is false.
+    """
+    if not windows:
+        return {}
+    rows, length = values.shape
+    valid = ~np.isnan(values)
+    has_gaps = not valid.all()
+    filled = np.where(valid, values, 0.0) if has_gaps else values
+
+    def cumulative(x: np.ndarray) -> np.ndarray:
+        out = np.zeros((rows, length + 1))
+        np.cumsum(x, axis=1, out=out[:, 1:])
+        return out
+
+    csum = cumulative(filled)
+    csq = cumulative(filled ** 2) if squares else None
+    ccount = cumulative(valid) if has_gaps else None
+    sums = {}
+    for window in windows:
+        total = np.full(values.shape, np.nan)
+        total_sq = np.full(values.shape, np.nan) if squares else None
+        if window <= length:
+            complete = (ccount[:, window:] - ccount[:, :-window]) == window if has_gaps else True
+            np.copyto(total[:, window - 1:], csum[:, window:] - csum[:, :-window], where=complete)
+            if squares:
+                np.copyto(total_sq[:, window - 1:], csq[:, window:] - csq[:, :-window], where=complete)
+        sums[window] = (total, total_sq)
+    return sums
+
+
+def recursive_smooth(inputs: np.ndarray, alphas: np.ndarray) -> np.ndarray:
+    """Exponential smoothing of a (series x symbols x time) stack, each series with its own alpha.
+
+    Matches ``ewm(alpha=..., adjust=False)``; each series starts at its first non-NaN value.
+    Series sharing an alpha are filtered together along time with ``lfilter``. Leading NaNs
+    are filled with the first value, so the filter state starts there; NaNs inside a series
+    hold the previous input. Both are NaN in the output.
+    """
+    valid = ~np.isnan(inputs)
+    filled = inputs
+    if not valid.all():
+        positions = np.broadcast_to(np.arange(inputs.shape[-1]), inputs.shape)
+        first = valid.argmax(axis=-1)[..., None]
+        filled = np.take_along_axis(inputs, np.maximum.accumulate(np.where(valid, positions, first), axis=-1),
+                                    axis=-1)
+    out = np.empty_like(inputs)
+    for alpha in np.unique(alphas):
+        rows = alphas == alpha
+        block = filled[rows]
+        # y[t] = alpha * x[t] + (1 - alpha) * y[t-1], seeded so that y[-1] = x[0].
+        out[rows], _ = lfilter([alpha], [1.0, alpha - 1.0], block, axis=-1, zi=(1.0 - alpha) * block[..., :1])
+    return out if filled is inputs else np.where(valid, out, np.nan)
+
+
+class IndicatorPlan:
+    """A feature spec compiled into the shared intermediates it needs.
+
+    ``compute`` takes (symbols x time) arrays and returns one new array per feature; all
+    moving averages share one cumulative sum and all exponential smoothers (EMA, MACD,
+    Wilder RSI/ATR) are stacked and filtered together along time.
+    """
+
+    def __init__(self, spec: Dict[str, list] = None):
+        self.spec = spec or DEFAULT_FEATURE_SPEC
+        unknown = set(self.spec) - INDICATOR_KINDS
+        if unknown:
+            raise ValueError(f"Unknown indicators in feature spec: {sorted(unknown)}")
+        self.close_windows = sorted(set(self.spec.get('ma', [])) | set(self.spec.get('bollinger', [])))
+        self.ema_spans = sorted(set(self.spec.get('ema', []))
+                                | {span for fast, slow, _ in self.spec.get('macd', []) for span in (fast, slow)})
+
+    def compute(self, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                volume: np.ndarray) -> Dict[str, np.ndarray]:
+        features = {}
+        close_sums = rolling_sums(close, self.close_windows, squares=bool(self.spec.get('bollinger')))
+        for window in self.spec.get('ma', []):
+            features[f'ma_{window}'] = close_sums[window][0] / window
+        for window in self.spec.get('bollinger', []):
+            total, total_sq = close_sums[window]
+            mid = total / window
+            std = np.sqrt(np.maximum(total_sq - total * mid, 0.0) / max(window - 1, 1))
+            features[f'bb_mid_{window}'] = mid
+            features[f'bb_upper_{window}'] = mid + 2 * std
+            features[f'bb_lower_{window}'] = mid - 2 * std
+
+        # Every exponential smoother is one row of a single stacked recursive pass.
+        prev_close = np.concatenate([np.full((close.shape[0], 1), np.nan), close[:, :-1]], axis=1)
+        rows, alphas = [], []
+        for span in self.ema_spans:
+            rows.append(close)
+            alphas.append(2.0 / (span + 1))
+        change = close - prev_close
+        for period in self.spec.get('rsi', []):
+            rows += [np.where(np.isnan(change), np.nan, np.maximum(change, 0.0)),
+                     np.where(np.isnan(change), np.nan, np.maximum(-change, 0.0))]
+            alphas += [1.0 / period, 1.0 / period]
+        if self.spec.get('atr'):
+            true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        for period in self.spec.get('atr', []):
+            rows.append(true_range)
+            alphas.append(1.0 / period)
+        smoothed = iter(recursive_smooth(np.stack(rows), np.array(alphas))) if rows else iter(())
+
+        emas = {span: next(smoothed) for span in self.ema_spans}
+        for span in self.spec.get('ema', []):
+            features[f'ema_{span}'] = emas[span]
+        for period in self.spec.get('rsi', []):
+            gain, loss = next(smoothed), next(smoothed)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                features[f'rsi_{period}'] = np.where(loss == 0, 100.0, 100.0 - 100.0 / (1.0 + gain / loss))
+        for period in self.spec.get('atr', []):
+            features[f'atr_{period}'] = next(smoothed)
+
+        macd_specs = self.spec.get('macd', [])
+        if macd_specs:
+            lines = np.stack([emas[fast] - emas[slow] for fast, slow, _ in macd_specs])
+            signals = recursive_smooth(lines, np.array([2.0 / (signal + 1) for _, _, signal in macd_specs]))
+            for (fast, slow, signal), line, signal_line in zip(macd_specs, lines, signals):
+                name = f'macd_{fast}_{slow}_{signal}'
+                features[name] = line
+                features[f'{name}_signal'] = signal_line
+                features[f'{name}_hist'] = line - signal_line
+
+        volume_windows = self.spec.get('volume', [])
+        volume_sums = rolling_sums(volume, volume_windows, squares=False)
+        for window in volume_windows:
+            volume_ma = volume_sums[window][0] / window
+            features[f'volume_ma_{window}'] = volume_ma
+            with np.errstate(divide='ignore', invalid='ignore'):
+                features[f'volume_ratio_{window}'] = np.where(volume_ma > 0, volume / volume_ma, np.nan)
+        return features
@@ -0,0 +1,317 @@
+# app/utils/loadtest.py
+
+# Load-test harness for the prediction API.
+#
+#   python -m app.utils.loadtest run --mode inprocess --concurrency 20 --duration 30 \
+#       --mix predict=8,intervals=1,webhook=1
+#   python -m app.utils.loadtest serve --port 8765   # fake-backed server for --mode external
+#
+# The server runs with a fake exchange (synthetic candles with configurable latency) and
+# a stubbed payment provider, so no network access or Stripe credentials are needed. Its
+# SQLite stores live in a temporary directory, leaving the real app/data databases untouched.
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Tuple
+from unittest.mock import patch
+
+import httpx
+import numpy as np
+import uvicorn
+
+from app.data.resampler import TIMEFRAMES
+from app.utils.timing import parse_server_timing
+
+LOADTEST_API_KEY = "loadtest_api_key"
+SYMBOLS = ['BTC_USD', 'ETH_USD']
+
+
+class FakeExchange:
+    """Stands in for a ccxt exchange, returning a deterministic random walk per symbol."""
+
+    def __init__(self, name: str, latency: float = 0.05, candles: int = 500):
+        self.name = name
+        self.latency = latency
+        self.candles = candles
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1h', since: int = None) -> List[List[float]]:
+        await asyncio.sleep(self.latency)
+        step = TIMEFRAMES[timeframe]
+        # The walk is anchored at the epoch so candles are stable across calls and pages.
+        end = int(time.time() * 1000) // step
+        start = end - self.candles + 1 if since is None else -(-since // step)
+        start = min(start, end)
+        index = np.arange(start, min(end, start + self.candles - 1) + 1)
+        seed = zlib.crc32(f"{self.name}:{symbol}".encode()) % 1000
+        # Cheap hash noise in [-0.01, 0.01) that depends only on the candle index.
+        noise = ((np.sin(np.outer(index, [12.9898, 78.233]) + seed) * 43758.5453) % 1 - 0.5) * 0.02
+        close = 100 * np.exp(np.sin(index / 200) * 0.2 + noise[:, 0])
+        open_ = close * np.exp(noise[:, 1])
+        spread = np.abs(noise[:, 0]) * close
+        volume = 1 + 99 * np.abs(np.sin(index * 0.7 + seed))
+        return np.column_stack([index * step, open_, np.maximum(open_, close) + spread,
+                                np.minimum(open_, close) - spread, close, volume]).tolist()
+
+    async def close(self):
+        pass
+
+
+def install_fakes(exchange_latency: float):
+    """Patch external dependencies and return the FastAPI app ready for load testing."""
+    if "app.api.routes" in sys.modules:
+        raise RuntimeError("install_fakes must run before app.api.routes is imported.")
+    # The routes open their stores on import, so redirect them first.
+    os.environ["APP_DATA_DIR"] = tempfile.mkdtemp(prefix="loadtest_")
+    logging.info(f"Load-test stores in {os.environ['APP_DATA_DIR']}.")
+
+    from app.utils.monetization import PaymentProvider
+    # The payment provider is instantiated when the routes are imported, so stub it first.
+    patch.object(PaymentProvider, 'initialize_provider', lambda self: None).start()
+    patch.object(PaymentProvider, 'handle_stripe_webhook',
+                 lambda self, payload, sig_header, endpoint_secret: json.loads(payload)).start()
+    patch.object(PaymentProvider, 'generate_api_key', lambda self, user_id: str(uuid.uuid4())).start()
+
+    from app.api import app
+    from app.api import routes
+    routes.collector.exchanges = {name: FakeExchange(name, exchange_latency) for name in routes.collector.exchanges}
+    routes.config.api_keys.allowed_keys.append(LOADTEST_API_KEY)
+    routes.rate_limiter.tiers = dict(routes.rate_limiter.tiers,
+                                     loadtest={'rate': math.inf, 'burst': math.inf, 'monthly_quota': math.inf})
+    routes.rate_limiter.key_tiers[LOADTEST_API_KEY] = 'loadtest'
+    try:
+        routes.predictor.load_model()
+    except FileNotFoundError:
+        logging.warning("No trained model found; load testing with an untrained model.")
+        routes.predictor.build_model()
+    return app
+
+
+def serve(port: int, exchange_latency: float):
+    uvicorn.run(install_fakes(exchange_latency), host="127.0.0.1", port=port, log_level="warning")
+
+
+def start_server(app, port: int, timeout: float = 120.0) -> uvicorn.Server:
+    """Run ``app`` with uvicorn on a background thread and wait until it accepts connections."""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + timeout
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"Load-test server failed to start on port {port}.")
+        if time.time() > deadline:
+            server.should_exit = True
+            raise TimeoutError("Load-test server did not start in time.")
+        time.sleep(0.05)
+    return server
+
+
+def start_in_process(port: int, exchange_latency: float, timeout: float = 120.0) -> uvicorn.Server:
+    return start_server(install_fakes(exchange_latency), port, timeout)
+
+
+def start_subprocess(port: int, exchange_latency: float, timeout: float = 120.0) -> subprocess.Popen:
+    process = subprocess.Popen([sys.executable, "-m", "app.utils.loadtest", "serve", "--port", str(port),
+                                "--exchange-latency", str(exchange_latency)])
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Load-test server exited with code {process.returncode}.")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/docs").status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise TimeoutError("Load-test server did not start in time.")
+
+
+def make_scenarios(duplicate_ratio: float) -> Dict[str, Callable[[], Tuple[str, str, dict]]]:
+    # FastAPI reads the ``api_key`` header parameter from the ``api-key`` header.
+    headers = {"api-key": LOADTEST_API_KEY}
+    sent_events = []
+
+    def predict():
+        return "POST", f"/api/predict/{random.choice(SYMBOLS)}", {"headers": headers}
+
+    def intervals():
+        # There is no batch-predict route; MC intervals are the batched-inference path.
+        return "POST", f"/api/predict/{random.choice(SYMBOLS)}?uncertainty=true&samples=100", {"headers": headers}
+
+    def export():
+        return "GET", "/api/export/candles?format=ndjson", {"headers": headers}
+
+    def webhook():
+        if sent_events and random.random() < duplicate_ratio:
+            event_id = random.choice(sent_events)
+        else:
+            event_id = f"evt_{uuid.uuid4().hex}"
+            sent_events.append(event_id)
+        event = {"id": event_id, "type": "checkout.session.completed", "data": {"object": {"customer": event_id}}}
+        return "POST", "/api/stripe-webhook", {"content": json.dumps(event), "headers": {"stripe-signature": "stub"}}
+
+    return {"predict": predict, "intervals": intervals, "export": export, "webhook": webhook}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for entry in mix.split(","):
+        name, _, weight = entry.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+async def run_load(base_url: str, mix: Dict[str, float], concurrency: int, duration: float,
+                   warmup: int = 3, duplicate_ratio: float = 0.1) -> Dict[str, dict]:
+    scenarios = make_scenarios(duplicate_ratio)
+    unknown = set(mix) - set(scenarios)
+    if unknown:
+        raise ValueError(f"Unknown scenarios in mix: {sorted(unknown)}")
+    names, weights = list(mix), list(mix.values())
+    samples = defaultdict(lambda: {"latencies": [], "errors": 0, "statuses": Counter(), "stages": defaultdict(list)})
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        for _ in range(warmup):
+            method, url, kwargs = scenarios["predict"]()
+            await client.request(method, url, **kwargs)
+
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                name = random.choices(names, weights)[0]
+                method, url, kwargs = scenarios[name]()
+                sample = samples[name]
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, url, **kwargs)
+                    await response.aread()
+                except httpx.HTTPError as e:
+                    sample["errors"] += 1
+                    sample["statuses"][type(e).__name__] += 1
+                    continue
+                sample["latencies"].append((time.perf_counter() - start) * 1000)
+                sample["statuses"][response.status_code] += 1
+                if response.status_code >= 400:
+                    sample["errors"] += 1
+                for stage, duration_ms in parse_server_timing(response.headers.get("server-timing", "")).items():
+                    sample["stages"][stage].append(duration_ms)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return summarize(samples, elapsed)
+
+
+def summarize(samples: Dict[str, dict], elapsed: float) -> Dict[str, dict]:
+    def percentiles(values: List[float]) -> Dict[str, float]:
+        if not values:
+            return {}
+        p50, p90, p99 = np.percentile(values, [50, 90, 99])
+        return {"p50": p50, "p90": p90, "p99": p99, "max": max(values)}
+
+    report = {}
+    all_latencies, total_requests, total_errors = [], 0, 0
+    for name, sample in samples.items():
+        requests = len(sample["latencies"]) + sum(
+            count for status, count in sample["statuses"].items() if not isinstance(status, int))
+        report[name] = {
+            "requests": requests,
+            "errors": sample["errors"],
+            "error_rate": sample["errors"] / requests if requests else 0.0,
+            "throughput": requests / elapsed,
+            "latency_ms": percentiles(sample["latencies"]),
+            "statuses": {str(status): count for status, count in sample["statuses"].items()},
+            "stages_ms": {stage: percentiles(values) for stage, values in sample["stages"].items()},
+        }
+        all_latencies += sample["latencies"]
+        total_requests += requests
+        total_errors += sample["errors"]
+    report["total"] = {
+        "requests": total_requests,
+        "errors": total_errors,
+        "error_rate": total_errors / total_requests if total_requests else 0.0,
+        "throughput": total_requests / elapsed,
+        "latency_ms": percentiles(all_latencies),
+        "duration_s": elapsed,
+    }
+    return report
+
+
+def print_report(report: Dict[str, dict]):
+    print(f"{'scenario':<12}{'requests':>10}{'rps':>10}{'errors':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, result in report.items():
+        latency = result["latency_ms"]
+        print(f"{name:<12}{result['requests']:>10}{result['throughput']:>10.1f}{result['error_rate']:>8.1%}"
+              + "".join(f"{latency.get(p, float('nan')):>10.1f}" for p in ("p50", "p90", "p99", "max")))
+    for name, result in report.items():
+        for stage, stats in result.get("stages_ms", {}).items():
+            print(f"  {name + '.' + stage:<24} p50 {stats['p50']:8.2f} ms   p99 {stats['p99']:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the prediction API against fake backends.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Run a fake-backed API server.")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--exchange-latency", type=float, default=0.05)
+
+    run_parser = subparsers.add_parser("run", help="Drive traffic and report latency and throughput.")
+    run_parser.add_argument("--mode", choices=["inprocess", "subprocess", "external"], default="subprocess",
+                            help="inprocess shares the GIL with the client and skews latencies under load.")
+    run_parser.add_argument("--url", default=None, help="Base URL of the server for --mode external.")
+    run_parser.add_argument("--port", type=int, default=8765)
+    run_parser.add_argument("--exchange-latency", type=float, default=0.05)
+    run_parser.add_argument("--concurrency", type=int, default=20)
+    run_parser.add_argument("--duration", type=float, default=30.0)
+    run_parser.add_argument("--warmup", type=int, default=3)
+    run_parser.add_argument("--mix", default="predict=8,intervals=1,webhook=1")
+    run_parser.add_argument("--duplicate-ratio", type=float, default=0.1,
+                            help="Fraction of webhook deliveries that repeat an earlier event ID.")
+    run_parser.add_argument("--json", default=None, help="Also write the report to this JSON file.")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.port, args.exchange_latency)
+        return
+
+    base_url = args.url or f"http://127.0.0.1:{args.port}"
+    server, process = None, None
+    if args.mode == "inprocess":
+        server = start_in_process(args.port, args.exchange_latency)
+    elif args.mode == "subprocess":
+        process = start_subprocess(args.port, args.exchange_latency)
+    try:
+        report = asyncio.run(run_load(base_url, parse_mix(args.mix), args.concurrency, args.duration,
+                                      args.warmup, args.duplicate_ratio))
+    finally:
+        if server:
+            server.should_exit = True
+        if process:
+            process.terminate()
+            process.wait()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,26 +3,31 @@
 import sys
 import asyncio
 from PyQt5.QtWidgets import QApplication, QMainWindow, QMessageBox
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
+import numpy as np
 from app.gui.ui_main import Ui_MainWindow  # Assume a separate UI file
 from app.models.predictor import PricePredictor
 from app.data.collector import DataCollector
-from app.data.processor import DataProcessor
+from app.data.processor import DataProcessor, CONSOLIDATED_SOURCE
 from app.config import load_config
+from tensorflow.keras.callbacks import LambdaCallback
 import logging
 from app.utils.logger import setup_logger
 
 
 class PredictionThread(QThread):
+    history_ready = pyqtSignal(object, object)
     prediction_ready = pyqtSignal(list)
     error_occurred = pyqtSignal(str)
 
-    def __init__(self, predictor: PricePredictor, collector: DataCollector, processor: DataProcessor, symbol: str):
+    def __init__(self, predictor: PricePredictor, collector: DataCollector, processor: DataProcessor, symbol: str,
+                 source: str = 'binance'):
         super().__init__()
         self.predictor = predictor
         self.collector = collector
         self.processor = processor
         self.symbol = symbol
+        self.source = source
 
     def run(self):
         try:
@@ -30,17 +35,20 @@ class PredictionThread(QThread):
             asyncio.set_event_loop(loop)
             raw_data = loop.run_until_complete(self.collector.collect_all_data())
             processed_data = self.processor.preprocess(raw_data)
+            if self.source == CONSOLIDATED_SOURCE:
+                processed_data.update(self.processor.consolidate(raw_data))
             engineered_data = self.processor.feature_engineering(processed_data)
 
-            key = f"binance_{self.symbol.replace('/', '_')}"
+            key = f"{self.source}_{self.symbol.replace('/', '_')}"
             if key not in engineered_data:
                 raise ValueError(f"Data for {self.symbol} not found.")
 
             df = engineered_data[key]
+            self.history_ready.emit(df.index.asi8 // 10**6, df['close'].to_numpy())
             data = self.predictor.prepare_data(df)
 
             prediction_input = data['X'][-1].reshape(1, self.predictor.input_steps, data['X'].shape[2])
-            predictions = self.predictor.predict(prediction_input).flatten().tolist()
+            predictions = self.predictor.predict(prediction_input, scaler=data['scaler']).flatten().tolist()
 
             self.prediction_ready.emit(predictions)
         except Exception as e:
@@ -48,8 +56,35 @@ class PredictionThread(QThread):
             self.error_occurred.emit(str(e))
 
 
+class CandleThread(QThread):
+    """Fetches the latest candles of one symbol for the live chart."""
+
+    candles_ready = pyqtSignal(object, object)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, collector: DataCollector, symbol: str, source: str = 'binance', since: int = None):
+        super().__init__()
+        self.collector = collector
+        self.symbol = symbol
+        self.source = source
+        self.since = since
+
+    def run(self):
+        try:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            ohlcv = loop.run_until_complete(self.collector.fetch_data(self.source, self.symbol, since=self.since))
+            if ohlcv:
+                candles = np.asarray(ohlcv, dtype=np.float64)
+                self.candles_ready.emit(candles[:, 0], candles[:, 4])
+        except Exception as e:
+            logging.error(f"CandleThread error: {e}")
+            self.error_occurred.emit(str(e))
+
+
 class TrainingThread(QThread):
-    training_complete = pyqtSignal(float)
+    training_complete = pyqtSignal(object)
+    training_progress = pyqtSignal(str)
     training_error = pyqtSignal(str)
 
     def __init__(self, predictor: PricePredictor, collector: DataCollector, processor: DataProcessor):
@@ -67,19 +102,27 @@ class TrainingThread(QThread):
             engineered_data = self.processor.feature_engineering(processed_data)
 
             # Assuming training on all available data or specific symbols
+            last_loss = None
             for key, df in engineered_data.items():
-                data = self.predictor.prepare_data(df)
-                loss = self.predictor.train(data['X'], data['y'])
+                progress = LambdaCallback(on_epoch_end=lambda epoch, logs, key=key: self.training_progress.emit(
+                    f"Training {key}: epoch {epoch + 1}, loss {logs['loss']:.4f}"))
+                loss = self.predictor.fine_tune(df, key=key, callbacks=[progress])
+                if loss is None:
+                    continue
                 self.predictor.save_model()
+                self.predictor.save_state()
+                last_loss = loss
                 logging.info(f"Trained model for {key} with loss: {loss}")
 
-            self.training_complete.emit(loss)
+            self.training_complete.emit(last_loss)
         except Exception as e:
             logging.error(f"TrainingThread error: {e}")
             self.training_error.emit(str(e))
 
 
 class MainWindow(QMainWindow):
+    CHART_REFRESH_MS = 30 * 1000
+
     def __init__(self):
         super().__init__()
         self.ui = Ui_MainWindow()
@@ -97,11 +140,19 @@ class MainWindow(QMainWindow):
         
         self.collector = DataCollector(self.config)
         self.processor = DataProcessor()
+        self.chart_symbol = None
+        self.chart_source = 'binance'
+        self.candle_thread = None
 
         # Connect signals
         self.ui.predictButton.clicked.connect(self.on_predict)
         self.ui.trainButton.clicked.connect(self.on_train)
 
+        # Keep the chart live: poll for candles newer than the latest one shown.
+        self.chart_timer = QTimer(self)
+        self.chart_timer.timeout.connect(self.refresh_chart)
+        self.chart_timer.start(self.CHART_REFRESH_MS)
+
     def on_predict(self):
         symbol = self.ui.symbolInput.text().strip().upper()
         if not symbol:
@@ -111,16 +162,30 @@ class MainWindow(QMainWindow):
         self.ui.statusLabel.setText("Fetching data and making prediction...")
         self.ui.predictButton.setEnabled(False)
 
+        if symbol != self.chart_symbol:
+            self.ui.priceChart.reset()
+            self.chart_symbol = symbol
+
         self.prediction_thread = PredictionThread(self.predictor, self.collector, self.processor, symbol)
+        self.prediction_thread.history_ready.connect(self.ui.priceChart.add_candles)
         self.prediction_thread.prediction_ready.connect(self.display_prediction)
         self.prediction_thread.error_occurred.connect(self.handle_error)
         self.prediction_thread.start()
 
+    def refresh_chart(self):
+        if not self.chart_symbol or (self.candle_thread and self.candle_thread.isRunning()):
+            return
+        self.candle_thread = CandleThread(self.collector, self.chart_symbol, self.chart_source,
+                                          since=self.ui.priceChart.last_timestamp())
+        self.candle_thread.candles_ready.connect(self.ui.priceChart.add_candles)
+        self.candle_thread.error_occurred.connect(lambda error: self.logger.warning(f"Chart refresh failed: {error}"))
+        self.candle_thread.start()
+
     def display_prediction(self, predictions):
-        self.ui.statusLabel.setText("Prediction completed.")
+        prediction_text = ", ".join([f"Step {i+1}: {price:.2f}" for i, price in enumerate(predictions)])
+        self.ui.statusLabel.setText(f"Prediction completed. {prediction_text}")
         self.ui.predictButton.setEnabled(True)
-        prediction_text = "\n".join([f"Step {i+1}: {price:.2f}" for i, price in enumerate(predictions)])
-        QMessageBox.information(self, "Predicted Prices", prediction_text)
+        self.ui.priceChart.set_forecast(predictions)
 
     def handle_error(self, error_message):
         self.ui.statusLabel.setText("An error occurred.")
@@ -135,12 +200,16 @@ class MainWindow(QMainWindow):
 
             self.training_thread = TrainingThread(self.predictor, self.collector, self.processor)
             self.training_thread.training_complete.connect(self.training_success)
+            self.training_thread.training_progress.connect(self.ui.statusLabel.setText)
             self.training_thread.training_error.connect(self.training_failure)
             self.training_thread.start()
 
     def training_success(self, loss):
         self.ui.statusLabel.setText("Training completed successfully.")
         self.ui.trainButton.setEnabled(True)
+        if loss is None:
+            QMessageBox.information(self, "Training Complete", "The model is already up to date.")
+            return
         QMessageBox.information(self, "Training Complete", f"Model trained successfully with final loss: {loss:.4f}")
 
     def training_failure(self, error_message):
@@ -148,6 +217,13 @@ class MainWindow(QMainWindow):
         self.ui.trainButton.setEnabled(True)
         QMessageBox.critical(self, "Training Error", f"An error occurred during training:\n{error_message}")
 
+    def closeEvent(self, event):
+        self.chart_timer.stop()
+        if self.candle_thread:
+            self.candle_thread.wait()
+        self.ui.priceChart.stop()
+        super().closeEvent(event)
+
 
 def main():
     app = QApplication(sys.argv)
@@ -1,15 +1,17 @@
 # app/models/predictor.py
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 import numpy as np
 import pandas as pd
 from sklearn.preprocessing import MinMaxScaler
 from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import LSTM, Dense
+from tensorflow.keras.layers import LSTM, Dense, Dropout
 from tensorflow.keras.optimizers import Adam
+from tensorflow.keras.callbacks import Callback, EarlyStopping, BackupAndRestore
 import logging
 from app.config import Config
 import os
+import json
 
 
 class PricePredictor:
@@ -18,19 +20,36 @@ class PricePredictor:
         self.forecast_steps = config.model.forecast_steps
         self.scaler = MinMaxScaler(feature_range=(0, 1))
         self.model = None
+        # Bumped whenever the weights change, so cached outputs can be tied to a model.
+        self.model_version = 0
+        # model_version last written to or read from model_path; differs while changes are unsaved.
+        self.saved_version: Optional[int] = None
         self.model_path = "app/models/model.h5"
+        # Per-key training state; kept apart from self.scaler, which prepare_data refits on every call.
+        self.watermarks: Dict[str, str] = {}
+        self.training_scalers: Dict[str, MinMaxScaler] = {}
 
     def build_model(self):
         self.model = Sequential()
         self.model.add(LSTM(50, return_sequences=True, input_shape=(self.input_steps, 1)))
+        self.model.add(Dropout(0.2))
         self.model.add(LSTM(50))
+        self.model.add(Dropout(0.2))
         self.model.add(Dense(self.forecast_steps))
         self.model.compile(optimizer=Adam(learning_rate=0.001), loss='mean_squared_error')
+        self.model_version += 1
         logging.info("Model built successfully.")
 
-    def prepare_data(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def prepare_data(self, df: pd.DataFrame, scaler: MinMaxScaler = None) -> Dict[str, Any]:
+        """Scale ``df`` and cut it into training windows; the fitted scaler is returned with them.
+
+        Without ``scaler`` a new one is fitted and also kept as ``self.scaler``. Concurrent
+        callers should use the returned scaler, since ``self.scaler`` may be replaced meanwhile.
+        """
+        if scaler is None:
+            scaler = self.scaler = MinMaxScaler(feature_range=(0, 1))
         data = df['close'].values.reshape(-1, 1)
-        data = self.scaler.fit_transform(data)
+        data = scaler.fit_transform(data)
 
         X, y = [], []
         for i in range(self.input_steps, len(data) - self.forecast_steps +1):
@@ -39,29 +58,107 @@ class PricePredictor:
         X, y = np.array(X), np.array(y)
         X = np.reshape(X, (X.shape[0], X.shape[1], 1))
         logging.info("Data prepared for training/prediction.")
-        return {'X': X, 'y': y}
+        return {'X': X, 'y': y, 'scaler': scaler}
 
-    def train(self, X: np.ndarray, y: np.ndarray, epochs: int = 50, batch_size: int = 32) -> float:
+    def train(self, X: np.ndarray, y: np.ndarray, epochs: int = 50, batch_size: int = 32,
+              callbacks: List[Callback] = None) -> float:
         if not self.model:
             self.build_model()
-        history = self.model.fit(X, y, epochs=epochs, batch_size=batch_size, verbose=0)
+        history = self.model.fit(X, y, epochs=epochs, batch_size=batch_size, verbose=0, callbacks=callbacks)
+        self.model_version += 1
         final_loss = history.history['loss'][-1]
         logging.info(f"Model trained with final loss: {final_loss}")
         return final_loss
 
-    def predict(self, input_data: np.ndarray) -> np.ndarray:
+    def fine_tune(self, df: pd.DataFrame, key: str = 'default', epochs: int = 10, batch_size: int = 32,
+                  replay_size: int = 256, patience: int = 2, checkpoint_dir: str = None,
+                  callbacks: List[Callback] = None) -> Optional[float]:
+        """Continue training the current model on windows added since the last watermark of ``key``.
+
+        A random replay sample of older windows is mixed in to limit forgetting, and the
+        scaler fitted when ``key`` was first trained is reused so its input scale is unchanged.
+        Progress is backed up every epoch and resumed if an interrupted run is restarted.
+        Falls back to full training when there is no model or watermark yet and returns
+        ``None`` when no new windows are available.
+        """
+        watermark = self.watermarks.get(key)
+        scaler = self.training_scalers.get(key)
+        if not self.model or watermark is None or scaler is None:
+            logging.info(f"No training watermark for {key}. Running full training.")
+            scaler = MinMaxScaler(feature_range=(0, 1))
+            data = self.prepare_data(df, scaler=scaler)
+            loss = self.train(data['X'], data['y'], callbacks=callbacks)
+            self.watermarks[key] = str(df.index[-1])
+            self.training_scalers[key] = scaler
+            return loss
+
+        closes = scaler.transform(df['close'].values.reshape(-1, 1))[:, 0]
+        windows = np.lib.stride_tricks.sliding_window_view(closes, self.input_steps + self.forecast_steps)
+        # A window is new if its last target candle lies past the watermark.
+        is_new = df.index[self.input_steps + self.forecast_steps - 1:] > pd.Timestamp(watermark)
+        new_idx, old_idx = np.flatnonzero(is_new), np.flatnonzero(~is_new)
+        if len(new_idx) == 0:
+            logging.info(f"No new data for {key} since {watermark}. Skipping fine-tuning.")
+            return None
+
+        replay_idx = np.random.default_rng().choice(old_idx, size=min(replay_size, len(old_idx)), replace=False)
+        idx = np.concatenate([replay_idx, new_idx])
+        X = windows[idx, :self.input_steps].reshape(-1, self.input_steps, 1)
+        y = windows[idx, self.input_steps:]
+
+        checkpoint_dir = checkpoint_dir or os.path.splitext(self.model_path)[0] + "_checkpoints"
+        fit_callbacks = [
+            EarlyStopping(monitor='loss', patience=patience, restore_best_weights=True),
+            BackupAndRestore(backup_dir=checkpoint_dir),
+        ] + (callbacks or [])
+        history = self.model.fit(X, y, epochs=epochs, batch_size=batch_size, verbose=0, callbacks=fit_callbacks)
+        self.model_version += 1
+        final_loss = history.history['loss'][-1]
+        self.watermarks[key] = str(df.index[-1])
+        logging.info(f"Fine-tuned model for {key} on {len(new_idx)} new and {len(replay_idx)} replayed windows "
+                     f"with final loss: {final_loss}")
+        return final_loss
+
+    def predict(self, input_data: np.ndarray, scaler: MinMaxScaler = None) -> np.ndarray:
         if not self.model:
             raise ValueError("Model is not loaded.")
+        scaler = scaler or self.scaler
         predictions = self.model.predict(input_data)
-        predictions = self.scaler.inverse_transform(predictions)
+        predictions = scaler.inverse_transform(predictions)
         logging.info("Prediction made successfully.")
         return predictions
 
+    def predict_intervals(self, input_data: np.ndarray, samples: int = 100,
+                          quantiles: Tuple[float, ...] = (0.05, 0.5, 0.95),
+                          scaler: MinMaxScaler = None) -> Dict[float, np.ndarray]:
+        """Forecast quantiles from MC-dropout, with all samples in a single forward pass.
+
+        Every input row is repeated ``samples`` times along the batch dimension and run once
+        with dropout active; returns ``{quantile: (rows, forecast_steps) prices}`` using
+        ``scaler`` (default ``self.scaler``) to map back to prices.
+        """
+        if not self.model:
+            raise ValueError("Model is not loaded.")
+        scaler = scaler or self.scaler
+        if not any(isinstance(layer, Dropout) for layer in self.model.layers):
+            logging.warning("Model has no dropout layers; prediction intervals will have zero width.")
+        rows = input_data.shape[0]
+        batch = np.repeat(input_data, samples, axis=0)
+        draws = np.asarray(self.model(batch, training=True)).reshape(rows, samples, self.forecast_steps)
+        intervals = {}
+        for q, values in zip(quantiles, np.quantile(draws, quantiles, axis=1)):
+            # MinMax scaling is monotonic, so quantiles can be inverse-transformed directly.
+            intervals[q] = scaler.inverse_transform(values.reshape(-1, 1)).reshape(rows, self.forecast_steps)
+        logging.info(f"Prediction intervals computed from {samples} MC-dropout samples.")
+        return intervals
+
     def save_model(self, path: str = None):
         if not self.model:
             raise ValueError("No model to save.")
         path = path or self.model_path
         self.model.save(path)
+        if path == self.model_path:
+            self.saved_version = self.model_version
         logging.info(f"Model saved to {path}.")
 
     def load_model(self, path: str = None):
@@ -69,4 +166,39 @@ class PricePredictor:
         if not os.path.exists(path):
             raise FileNotFoundError(f"Model file not found at {path}.")
         self.model = load_model(path)
+        self.model_version += 1
+        if path == self.model_path:
+            self.saved_version = self.model_version
         logging.info(f"Model loaded from {path}.")
+        self.load_state(path)
+
+    def state_path(self, path: str = None) -> str:
+        return os.path.splitext(path or self.model_path)[0] + "_state.json"
+
+    def save_state(self, path: str = None):
+        state = {
+            key: {
+                'watermark': watermark,
+                'data_min': self.training_scalers[key].data_min_.tolist(),
+                'data_max': self.training_scalers[key].data_max_.tolist(),
+            }
+            for key, watermark in self.watermarks.items()
+        }
+        with open(self.state_path(path), "w") as f:
+            json.dump(state, f)
+        logging.info(f"Training state saved to {self.state_path(path)}.")
+
+    def load_state(self, path: str = None) -> bool:
+        state_path = self.state_path(path)
+        if not os.path.exists(state_path):
+            logging.warning(f"Training state not found at {state_path}.")
+            return False
+        with open(state_path, "r") as f:
+            state = json.load(f)
+        self.watermarks = {key: entry['watermark'] for key, entry in state.items()}
+        self.training_scalers = {
+            key: MinMaxScaler(feature_range=(0, 1)).fit(np.array([entry['data_min'], entry['data_max']]))
+            for key, entry in state.items()
+        }
+        logging.info(f"Training state loaded from {state_path}.")
+        return True
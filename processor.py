@@ -5,6 +5,10 @@ import pandas as pd
 import numpy as np
 import logging
 from app.config import Config
+from app.data.indicators import IndicatorPlan, stack_frames
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+CONSOLIDATED_SOURCE = 'consolidated'
 
 
 class DataProcessor:
@@ -17,20 +21,111 @@ class DataProcessor:
             if not ohlcv:
                 logging.warning(f"No data for {key}. Skipping preprocessing.")
                 continue
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+            df = pd.DataFrame(ohlcv, columns=OHLCV_COLUMNS)
             df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
             df.set_index('timestamp', inplace=True)
             processed_data[key] = df
             logging.info(f"Preprocessed data for {key}.")
         return processed_data
 
-    def feature_engineering(self, processed_data: Dict[str, pd.DataFrame], max_depth: int = 3) -> Dict[str, pd.DataFrame]:
+    def consolidate(self, raw_data: Dict[str, List[List[float]]]) -> Dict[str, pd.DataFrame]:
+        """Merge the per-exchange candles of every symbol into one volume-weighted series.
+
+        All exchanges and symbols are aligned on a shared timestamp grid in a single
+        (symbols x exchanges x time) array. Bars missing on an exchange are NaN and are
+        ignored; open and close are volume-weighted across exchanges, high/low are the
+        extremes and volume is the total. Results are keyed ``consolidated_<SYMBOL>``.
+        """
+        series = {}
+        for key, ohlcv in raw_data.items():
+            if not ohlcv or '_' not in key:
+                continue
+            exchange_name, symbol_key = key.split('_', 1)
+            if exchange_name == CONSOLIDATED_SOURCE:
+                continue
+            series.setdefault(symbol_key, {})[exchange_name] = np.asarray(ohlcv, dtype=np.float64)
+        if not series:
+            logging.warning("No exchange data available for consolidation.")
+            return {}
+
+        symbols = list(series.keys())
+        exchanges = sorted({name for per_symbol in series.values() for name in per_symbol})
+        timestamps = np.unique(np.concatenate([
+            arr[:, 0] for per_symbol in series.values() for arr in per_symbol.values()
+        ]))
+
+        # Scatter every exchange's candles onto the shared grid; absent bars stay NaN.
+        grid = np.full((len(symbols), len(exchanges), len(timestamps), 5), np.nan)
+        for s_idx, symbol_key in enumerate(symbols):
+            for exchange_name, arr in series[symbol_key].items():
+                t_idx = np.searchsorted(timestamps, arr[:, 0])
+                grid[s_idx, exchanges.index(exchange_name), t_idx] = arr[:, 1:6]
+
+        opens, highs, lows, closes, volumes = np.moveaxis(grid, -1, 0)
+        present = ~np.isnan(closes)
+        weights = np.where(present, np.nan_to_num(volumes), 0.0)
+        total_volume = weights.sum(axis=1)
+        counts = present.sum(axis=1)
+
+        def weighted(prices: np.ndarray) -> np.ndarray:
+            filled = np.nan_to_num(prices)
+            vwap = (filled * weights).sum(axis=1) / np.where(total_volume > 0, total_volume, 1.0)
+            mean = filled.sum(axis=1) / np.maximum(counts, 1)
+            # Fall back to a plain mean for bars where no exchange reported volume.
+            return np.where(total_volume > 0, vwap, mean)
+
+        consolidated = np.stack([
+            weighted(opens),
+            np.where(present, highs, -np.inf).max(axis=1),
+            np.where(present, lows, np.inf).min(axis=1),
+            weighted(closes),
+            total_volume,
+        ], axis=-1)
+
+        index = pd.to_datetime(timestamps, unit='ms')
+        index.name = 'timestamp'
+        consolidated_data = {}
+        for s_idx, symbol_key in enumerate(symbols):
+            mask = counts[s_idx] > 0
+            df = pd.DataFrame(consolidated[s_idx, mask], index=index[mask], columns=OHLCV_COLUMNS[1:])
+            key = f"{CONSOLIDATED_SOURCE}_{symbol_key}"
+            consolidated_data[key] = df
+            logging.info(f"Consolidated {len(series[symbol_key])} exchanges into {key}.")
+        return consolidated_data
+
+    def feature_engineering(self, processed_data: Dict[str, pd.DataFrame], max_depth: int = 3,
+                            spec: Dict[str, list] = None) -> Dict[str, pd.DataFrame]:
+        """Compute indicator features for all symbols in one pass; input frames are not modified.
+
+        ``spec`` is a declarative feature spec (see ``app.data.indicators``). Without one,
+        the legacy ``ma_<depth>``/``ema_<depth>`` features for ``max_depth`` windows are built.
+        """
+        if not processed_data:
+            return {}
+        renames = {}
+        if spec is None:
+            windows = [10 + depth * 5 for depth in range(max_depth)]
+            spec = {'ma': windows, 'ema': windows}
+            for depth, window in enumerate(windows):
+                renames.update({f'ma_{window}': f'ma_{depth}', f'ema_{window}': f'ema_{depth}'})
+
+        arrays = stack_frames(processed_data, ['high', 'low', 'close', 'volume'])
+        features = IndicatorPlan(spec).compute(**arrays)
+
+        names = [renames.get(name, name) for name in features]
+        # symbols x time x features
+        stacked = np.stack(list(features.values()), axis=-1) if features else np.empty(arrays['close'].shape + (0,))
         engineered_data = {}
-        for key, df in processed_data.items():
-            for depth in range(max_depth):
-                df[f'ma_{depth}'] = df['close'].rolling(window=10 + depth * 5).mean()
-                df[f'ema_{depth}'] = df['close'].ewm(span=10 + depth * 5, adjust=False).mean()
-            df.dropna(inplace=True)
-            engineered_data[key] = df
+        for s_idx, (key, df) in enumerate(processed_data.items()):
+            # Frames are right-aligned in the stacked arrays, so each one owns the last len(df) rows.
+            block = stacked[s_idx, stacked.shape[1] - len(df):]
+            # One block for all features and a numpy row mask are much cheaper than per-column
+            # inserts followed by dropna.
+            keep = ~np.isnan(block).any(axis=1) & df.notna().all(axis=1).to_numpy()
+            engineered = pd.concat([df.drop(columns=names, errors='ignore'),
+                                    pd.DataFrame(block, index=df.index, columns=names)], axis=1)
+            # Usually only the indicator warm-up is dropped, which a slice handles without a copy.
+            first = int(keep.argmax())
+            engineered_data[key] = engineered.iloc[first:] if keep[first:].all() else engineered[keep]
             logging.info(f"Engineered features for {key}.")
         return engineered_data
@@ -0,0 +1,133 @@
+# app/utils/rate_limiter.py
+
+import asyncio
+import calendar
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+# rate: sustained requests per second, burst: bucket size, monthly_quota: requests per calendar month (UTC).
+DEFAULT_TIERS = {
+    'free': {'rate': 1.0, 'burst': 10, 'monthly_quota': 10000},
+    'pro': {'rate': 10.0, 'burst': 100, 'monthly_quota': 1000000},
+}
+
+
+def current_month() -> Tuple[str, float]:
+    """Return the current UTC month as ``YYYY-MM`` and the epoch time at which it ends."""
+    now = time.gmtime()
+    year, month = (now.tm_year + 1, 1) if now.tm_mon == 12 else (now.tm_year, now.tm_mon + 1)
+    return f"{now.tm_year:04d}-{now.tm_mon:02d}", calendar.timegm((year, month, 1, 0, 0, 0))
+
+
+def key_tiers_from_config(config: Any) -> Dict[str, str]:
+    """Read the ``api_keys.tiers`` mapping of API key to tier name from the app config.
+
+    Accepts plain mappings as well as attribute-style config objects; a missing section is
+    logged rather than silently putting every key on the default tier.
+    """
+    api_keys = config['api_keys'] if isinstance(config, Mapping) else config.api_keys
+    tiers = api_keys.get('tiers') if isinstance(api_keys, Mapping) else getattr(api_keys, 'tiers', None)
+    if tiers is None:
+        logging.warning("No API key tiers configured; every key uses the default tier.")
+        return {}
+    if not isinstance(tiers, Mapping):
+        tiers = vars(tiers)
+    return {str(api_key): str(tier) for api_key, tier in tiers.items()}
+
+
+class RateLimiter:
+    """In-memory token buckets and monthly quota counters per API key.
+
+    Checks only touch dictionaries; usage counts are flushed to SQLite in batches by
+    ``flush`` (periodically via ``start``) and reloaded on construction.
+    """
+
+    def __init__(self, key_tiers: Dict[str, str] = None, tiers: Dict[str, dict] = None,
+                 default_tier: str = 'free', path: str = "app/data/usage.db", flush_interval: float = 30.0):
+        self.tiers = tiers or DEFAULT_TIERS
+        self.key_tiers = key_tiers or {}
+        self.default_tier = default_tier
+        unknown = ({default_tier} | set(self.key_tiers.values())) - set(self.tiers)
+        if unknown:
+            raise ValueError(f"Unknown rate limit tiers: {sorted(unknown)}")
+        self.flush_interval = flush_interval
+        self.buckets: Dict[str, list] = {}
+        self.usage: Dict[str, int] = {}
+        self.pending: Dict[str, int] = {}
+        self.month, self.month_end = current_month()
+        self.task: Optional[asyncio.Task] = None
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS usage (api_key TEXT, month TEXT, count INTEGER, PRIMARY KEY (api_key, month))"
+        )
+        self.usage = dict(self.connection.execute(
+            "SELECT api_key, count FROM usage WHERE month = ?", (self.month,)
+        ).fetchall())
+
+    def tier_name(self, api_key: str) -> str:
+        return self.key_tiers.get(api_key, self.default_tier)
+
+    def check(self, api_key: str) -> Tuple[bool, float]:
+        """Consume one request for ``api_key``; returns ``(allowed, retry_after_seconds)``."""
+        now = time.time()
+        if now >= self.month_end:
+            self.flush()
+            self.month, self.month_end = current_month()
+            self.usage.clear()
+        tier = self.tiers[self.tier_name(api_key)]
+
+        used = self.usage.get(api_key, 0)
+        if used >= tier['monthly_quota']:
+            return False, self.month_end - now
+
+        bucket = self.buckets.get(api_key)
+        if bucket is None:
+            bucket = self.buckets[api_key] = [float(tier['burst']), now]
+        tokens = min(tier['burst'], bucket[0] + (now - bucket[1]) * tier['rate'])
+        bucket[1] = now
+        if tokens < 1.0:
+            bucket[0] = tokens
+            return False, (1.0 - tokens) / tier['rate']
+        bucket[0] = tokens - 1.0
+
+        self.usage[api_key] = used + 1
+        self.pending[api_key] = self.pending.get(api_key, 0) + 1
+        return True, 0.0
+
+    def flush(self):
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO usage (api_key, month, count) VALUES (?, ?, ?)"
+                " ON CONFLICT (api_key, month) DO UPDATE SET count = count + excluded.count",
+                [(api_key, self.month, count) for api_key, count in pending.items()],
+            )
+        logging.debug(f"Flushed usage counters for {len(pending)} API keys.")
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logging.error(f"Error flushing usage counters: {e}")
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        self.flush()
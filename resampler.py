@@ -0,0 +1,128 @@
+# app/data/resampler.py
+
+from typing import Dict, List, Optional
+import numpy as np
+import logging
+import time
+
+TIMEFRAMES = {
+    '5m': 5 * 60 * 1000,
+    '15m': 15 * 60 * 1000,
+    '1h': 60 * 60 * 1000,
+    '4h': 4 * 60 * 60 * 1000,
+    '1d': 24 * 60 * 60 * 1000,
+}
+
+
+def aggregate_ohlcv(candles: np.ndarray, timeframe: str) -> np.ndarray:
+    """Aggregate time-sorted OHLCV rows into ``timeframe`` buckets aligned to the epoch."""
+    if len(candles) == 0:
+        return np.empty((0, 6))
+    step = TIMEFRAMES[timeframe]
+    buckets = candles[:, 0] // step * step
+    starts, first_idx = np.unique(buckets, return_index=True)
+    last_idx = np.append(first_idx[1:], len(candles)) - 1
+    return np.column_stack([
+        starts,
+        candles[first_idx, 1],
+        np.maximum.reduceat(candles[:, 2], first_idx),
+        np.minimum.reduceat(candles[:, 3], first_idx),
+        candles[last_idx, 4],
+        np.add.reduceat(candles[:, 5], first_idx),
+    ])
+
+
+class DataResampler:
+    """Derives coarser candles locally from the finest collected series.
+
+    Base candles are accumulated per key. Fetched candles that are already stored and
+    closed are ignored, so an update only re-aggregates the still-open bucket of each
+    derived timeframe; a backfill of older history re-aggregates that key from scratch.
+    Once ranges have been requested through ``fetch_since``, history older than the longest
+    of them is dropped so memory and per-request work stay bounded.
+    """
+
+    def __init__(self, base_timeframe: str = '1h'):
+        if base_timeframe not in TIMEFRAMES:
+            raise ValueError(f"Unsupported base timeframe '{base_timeframe}'.")
+        self.base_timeframe = base_timeframe
+        self.timeframes = [tf for tf, ms in TIMEFRAMES.items() if ms >= TIMEFRAMES[base_timeframe]]
+        self.base: Dict[str, np.ndarray] = {}
+        self.derived: Dict[str, Dict[str, np.ndarray]] = {}
+        self.covered_since: Optional[int] = None
+        # Longest span (ms) requested through fetch_since; older base candles are trimmed.
+        self.retention: Optional[int] = None
+
+    def fetch_since(self, timeframe: str, bars: int, now: Optional[int] = None) -> int:
+        """Return the timestamp to fetch base candles from so ``timeframe`` has ``bars`` candles.
+
+        Once that range has been fetched, only candles from the stored tail onwards are needed.
+        """
+        step = TIMEFRAMES[timeframe]
+        now = int(time.time() * 1000) if now is None else now
+        required = (now // step - bars) * step
+        self.retention = max(self.retention or 0, now - required)
+        if self.covered_since is None or required < self.covered_since or not self.base:
+            return required
+        return int(min(series[-1, 0] for series in self.base.values()))
+
+    def update(self, raw_data: Dict[str, List[List[float]]], since: Optional[int] = None):
+        # Coverage only counts once every key returned data, so a failed fetch is retried in full.
+        complete = bool(raw_data) and all(raw_data.values())
+        if since is not None and complete and (self.covered_since is None or since < self.covered_since):
+            self.covered_since = since
+        for key, ohlcv in raw_data.items():
+            if not ohlcv:
+                continue
+            new = np.asarray(ohlcv, dtype=np.float64)
+            new = new[np.argsort(new[:, 0], kind='stable')]
+
+            stored = self.base.get(key)
+            if stored is None:
+                base, first_ts = new, None
+            else:
+                # Keep only backfilled history before the stored head and candles from the
+                # stored tail onwards; the tail itself is replaced as it may have been open.
+                older = new[new[:, 0] < stored[0, 0]]
+                newer = new[new[:, 0] >= stored[-1, 0]]
+                if not len(older) and not len(newer):
+                    continue
+                kept = stored[stored[:, 0] < newer[0, 0]] if len(newer) else stored
+                base = np.concatenate([older, kept, newer])
+                first_ts = None if len(older) else newer[0, 0]
+            self.base[key] = base
+
+            derived = self.derived.setdefault(key, {})
+            for timeframe in self.timeframes:
+                if first_ts is None:
+                    derived[timeframe] = aggregate_ohlcv(base, timeframe)
+                    continue
+                step = TIMEFRAMES[timeframe]
+                open_bucket = first_ts // step * step
+                kept = derived.get(timeframe, np.empty((0, 6)))
+                kept = kept[kept[:, 0] < open_bucket]
+                tail = base[np.searchsorted(base[:, 0], open_bucket):]
+                derived[timeframe] = np.concatenate([kept, aggregate_ohlcv(tail, timeframe)])
+            self.trim(key)
+            logging.info(f"Resampled {len(new)} fetched candles for {key}.")
+
+    def trim(self, key: str):
+        if self.retention is None:
+            return
+        # Cut on a bucket boundary of the coarsest timeframe so no derived candle is left partial.
+        coarsest = TIMEFRAMES[self.timeframes[-1]]
+        cutoff = (self.base[key][-1, 0] - self.retention) // coarsest * coarsest
+        if self.base[key][0, 0] >= cutoff:
+            return
+        self.base[key] = self.base[key][self.base[key][:, 0] >= cutoff]
+        for timeframe, series in self.derived[key].items():
+            self.derived[key][timeframe] = series[series[:, 0] >= cutoff]
+
+    def get(self, timeframe: str, bars: Optional[int] = None) -> Dict[str, List[List[float]]]:
+        """Return the ``timeframe`` candles of every key, limited to the latest ``bars`` if given."""
+        if timeframe not in self.timeframes:
+            raise ValueError(
+                f"Timeframe '{timeframe}' cannot be derived from base timeframe '{self.base_timeframe}'."
+            )
+        start = -bars if bars else 0
+        return {key: series[timeframe][start:].tolist() for key, series in self.derived.items()}
@@ -1,14 +1,24 @@
 # app/api/routes.py
 
-from fastapi import APIRouter, HTTPException, Header, BackgroundTasks, Request
+from fastapi import APIRouter, HTTPException, Header, BackgroundTasks, Request, Depends, Query
 from typing import Optional
+from collections import OrderedDict
+import asyncio
 import logging
+import math
+import os
 from app.config import Config, load_config
 from app.models.predictor import PricePredictor
 from app.data.collector import DataCollector
-from app.data.processor import DataProcessor
+from app.data.processor import DataProcessor, CONSOLIDATED_SOURCE
+from app.data.resampler import DataResampler
+from app.data.history import HistoryStore, TABLE_COLUMNS
+from app.api.export import ENCODERS, MEDIA_TYPES, check_format
 from app.utils.monetization import PaymentProvider, verify_api_key
-from fastapi.responses import JSONResponse
+from app.utils.webhook_queue import WebhookQueue, WebhookWorker
+from app.utils.rate_limiter import RateLimiter, key_tiers_from_config
+from app.utils.timing import StageTimer
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 
 router = APIRouter()
 config = load_config()
@@ -16,7 +26,32 @@ logger = logging.getLogger("api_logger")
 predictor = PricePredictor(config)
 collector = DataCollector(config)
 processor = DataProcessor()
+# Finest timeframe fetched from the exchanges; coarser ones are derived. A finer base (e.g. 5m)
+# enables finer predictions at the cost of fetching more candles for coarse timeframes.
+resampler = DataResampler(os.environ.get("APP_BASE_TIMEFRAME", "1h"))
+# Local SQLite stores; APP_DATA_DIR lets tools such as the load-test harness keep them apart.
+DATA_DIR = os.environ.get("APP_DATA_DIR", "app/data")
+history = HistoryStore(os.path.join(DATA_DIR, "history.db"))
+interval_cache = OrderedDict()
+# Extra candles fetched beyond the model window so indicator warm-up rows can be dropped.
+FEATURE_WARMUP_BARS = 50
+INTERVAL_CACHE_SIZE = 256
 payment_provider = PaymentProvider(config)
+webhook_queue = WebhookQueue(os.path.join(DATA_DIR, "webhook_queue.db"))
+rate_limiter = RateLimiter(key_tiers=key_tiers_from_config(config), path=os.path.join(DATA_DIR, "usage.db"))
+
+
+def process_webhook_event(event: dict):
+    if event['type'] == 'checkout.session.completed':
+        session = event['data']['object']
+        # Retrieve customer information and generate API key
+        customer_id = session.get('customer')
+        user_id = customer_id  # Adjust based on your user management
+        api_key = payment_provider.generate_api_key(user_id)
+        logger.info(f"API key {api_key} generated for customer {customer_id}")
+
+
+webhook_worker = WebhookWorker(webhook_queue, process_webhook_event)
 
 
 @router.on_event("startup")
@@ -25,6 +60,25 @@ async def startup_event():
         predictor.load_model()
     except FileNotFoundError:
         logger.warning("Model not found. Please train the model first.")
+    webhook_worker.start()
+    rate_limiter.start()
+
+
+@router.on_event("shutdown")
+async def shutdown_event():
+    await webhook_worker.stop()
+    await rate_limiter.stop()
+
+
+async def rate_limited_api_key(api_key: Optional[str] = Header(None)) -> str:
+    if not verify_api_key(api_key, config):
+        logger.warning("Invalid API key attempted to access a rate-limited endpoint.")
+        raise HTTPException(status_code=403, detail="Invalid API Key")
+    allowed, retry_after = rate_limiter.check(api_key)
+    if not allowed:
+        raise HTTPException(status_code=429, detail="Rate limit exceeded",
+                            headers={"Retry-After": str(math.ceil(retry_after))})
+    return api_key
 
 
 @router.post("/create-payment-session")
@@ -51,42 +105,104 @@ async def stripe_webhook(request: Request):
         logger.error("Invalid Stripe webhook received.")
         raise HTTPException(status_code=400, detail="Invalid webhook")
 
-    # Handle the event
-    if event['type'] == 'checkout.session.completed':
-        session = event['data']['object']
-        # Retrieve customer information and generate API key
-        customer_id = session.get('customer')
-        user_id = customer_id  # Adjust based on your user management
-        api_key = payment_provider.generate_api_key(user_id)
-        logger.info(f"API key {api_key} generated for customer {customer_id}")
+    # Acknowledge immediately; the billing work runs in the background webhook worker.
+    if webhook_queue.enqueue(event):
+        logger.info(f"Queued webhook event {WebhookQueue.event_id(event)} ({event['type']}).")
+    else:
+        logger.info(f"Ignored duplicate webhook event {WebhookQueue.event_id(event)}.")
 
     return JSONResponse(content={"status": "success"})
 
 
 @router.post("/predict/{symbol}")
-async def predict(symbol: str, api_key: Optional[str] = Header(None)):
-    if not verify_api_key(api_key, config):
-        logger.warning("Invalid API key attempted to make a prediction.")
-        raise HTTPException(status_code=403, detail="Invalid API Key")
-
-    data = await collector.collect_all_data()
-    processed_data = processor.preprocess(data)
-    engineered_data = processor.feature_engineering(processed_data)
-
-    key = f"binance_{symbol.replace('/', '_')}"  # Adjust based on exchange selection
+async def predict(response: Response, symbol: str, source: str = "binance", timeframe: str = "1h",
+                  uncertainty: bool = False, samples: int = Query(100, ge=2, le=1000),
+                  api_key: str = Depends(rate_limited_api_key)):
+    if timeframe not in resampler.timeframes:
+        raise HTTPException(status_code=400, detail=f"Unsupported timeframe '{timeframe}'.")
+    timer = StageTimer()
+
+    # Only the base timeframe is fetched, from the stored tail onwards (or far enough back to
+    # cover the requested timeframe); coarser candles are derived locally.
+    required_bars = predictor.input_steps + predictor.forecast_steps + FEATURE_WARMUP_BARS
+    since = resampler.fetch_since(timeframe, required_bars)
+    with timer.stage("collect"):
+        raw_data = await collector.collect_all_data(timeframe=resampler.base_timeframe, since=since)
+    with timer.stage("store"):
+        await asyncio.to_thread(history.add_candles, raw_data, resampler.base_timeframe)
+    with timer.stage("features"):
+        resampler.update(raw_data, since=since)
+        data = resampler.get(timeframe, bars=required_bars)
+        processed_data = processor.preprocess(data)
+        if source == CONSOLIDATED_SOURCE:
+            processed_data.update(processor.consolidate(data))
+        engineered_data = processor.feature_engineering(processed_data)
+
+    key = f"{source}_{symbol.replace('/', '_')}"
     if key not in engineered_data:
         logger.error(f"Data for {symbol} not found.")
         raise HTTPException(status_code=404, detail=f"Data for {symbol} not found.")
 
     df = engineered_data[key]
-    prepared = predictor.prepare_data(df)
+    if len(df) < predictor.input_steps + predictor.forecast_steps:
+        logger.error(f"Insufficient {timeframe} data for {symbol}: {len(df)} candles.")
+        raise HTTPException(status_code=400, detail="Insufficient data for prediction.")
+    with timer.stage("prepare"):
+        prepared = predictor.prepare_data(df)
 
     if prepared['X'].shape[0] == 0:
         logger.error("Insufficient data for prediction.")
         raise HTTPException(status_code=400, detail="Insufficient data for prediction.")
 
+    # Concurrent requests may refit predictor.scaler while this one awaits, so keep its own.
+    scaler = prepared['scaler']
     input_data = prepared['X'][-1].reshape(1, predictor.input_steps, prepared['X'].shape[2])
-    predictions = predictor.predict(input_data).flatten().tolist()
+    with timer.stage("inference"):
+        predictions = predictor.predict(input_data, scaler=scaler).flatten().tolist()
+
+    last_timestamp = df.index[-1].value // 10**6
+    with timer.stage("store"):
+        await asyncio.to_thread(history.add_prediction, key, timeframe, last_timestamp, predictions)
 
     logger.info(f"Prediction made for {symbol}: {predictions}")
-    return {"predictions": predictions}
+    if not uncertainty:
+        response.headers["Server-Timing"] = timer.header()
+        return {"predictions": predictions}
+
+    # Cached per exact model input and scale: the last candle may still be open, so its close and
+    # the fitted scaler change between fetches even when the candle timestamp does not.
+    cache_key = (input_data.tobytes(), scaler.data_min_.tobytes(), scaler.data_max_.tobytes(), samples,
+                 predictor.model_version)
+    intervals = interval_cache.get(cache_key)
+    if intervals is None:
+        with timer.stage("intervals"):
+            # The MC-dropout pass takes hundreds of milliseconds; keep it off the event loop.
+            quantiles = await asyncio.to_thread(predictor.predict_intervals, input_data, samples=samples,
+                                                scaler=scaler)
+        intervals = {str(q): values[0].tolist() for q, values in quantiles.items()}
+        interval_cache[cache_key] = intervals
+        if len(interval_cache) > INTERVAL_CACHE_SIZE:
+            interval_cache.popitem(last=False)
+    else:
+        interval_cache.move_to_end(cache_key)
+    response.headers["Server-Timing"] = timer.header()
+    return {"predictions": predictions, "intervals": intervals}
+
+
+@router.get("/export/{dataset}")
+async def export(dataset: str, symbols: Optional[str] = None, source: str = "binance",
+                 timeframe: str = resampler.base_timeframe, start: Optional[int] = None, end: Optional[int] = None,
+                 format: str = "json", api_key: str = Depends(rate_limited_api_key)):
+    if dataset not in TABLE_COLUMNS:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset '{dataset}'.")
+    try:
+        check_format(format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    keys = [f"{source}_{s.strip().replace('/', '_')}" for s in symbols.split(',')] if symbols else None
+    # Candles are stored at the base timeframe; predictions at the timeframe they were served for.
+    key_prefix = None if keys else f"{source}_"
+    chunks = history.iter_chunks(dataset, timeframe, keys=keys, start=start, end=end, key_prefix=key_prefix)
+    logger.info(f"Exporting {dataset} for {keys or f'all {source} keys'} as {format}.")
+    return StreamingResponse(ENCODERS[format](chunks), media_type=MEDIA_TYPES[format])
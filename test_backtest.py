@@ -0,0 +1,69 @@
+# tests/test_backtest.py
+
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import MagicMock
+from app.models.backtest import Backtester, make_windows
+
+
+def persistence_model(forecast_steps):
+    # Predicts the last observed (scaled) close for every forecast step.
+    model = MagicMock()
+    model.predict.side_effect = lambda X, **kwargs: np.repeat(X[:, -1, :], forecast_steps, axis=1)
+    return model
+
+
+def test_make_windows():
+    X, y = make_windows(np.arange(10.0), 4, 2)
+    assert X.shape == (5, 4) and y.shape == (5, 2), "Windows should match prepare_data's sample count."
+    assert y[0].tolist() == [4.0, 5.0], "Targets should follow the input window."
+
+
+def test_run_batches_predictions(predictor, tmp_path):
+    predictor.model = persistence_model(predictor.forecast_steps)
+    predictor.model_path = str(tmp_path / "missing.h5")
+    df = pd.DataFrame({'close': np.arange(200.0)})
+    results = Backtester(predictor).run(df, folds=4)
+
+    n_windows = 200 - predictor.input_steps - predictor.forecast_steps + 1
+    assert predictor.model.predict.call_count == 4, "Each fold should use a single batched predict call."
+    assert results['windows'] == n_windows, "Every window should be evaluated."
+    assert np.allclose(results['mae'], np.arange(1, predictor.forecast_steps + 1)), "MAE should be reported per forecast step."
+    assert len(results['folds']) == 4, "Per-fold metrics should be reported."
+
+
+def test_run_uses_cache(predictor, tmp_path):
+    predictor.model = persistence_model(predictor.forecast_steps)
+    predictor.model_path = str(tmp_path / "model.h5")
+    (tmp_path / "model.h5").write_bytes(b"weights")
+    predictor.saved_version = predictor.model_version
+    backtester = Backtester(predictor, cache_dir=str(tmp_path / "cache"))
+    df = pd.DataFrame({'close': np.arange(100.0)})
+    first = backtester.run(df)
+    second = backtester.run(df)
+    assert first == second, "Cached results should match the original run."
+    assert predictor.model.predict.call_count == 1, "Second run should be served from cache."
+
+    predictor.model_version += 1  # E.g. fine-tuned but not saved yet.
+    backtester.run(df)
+    assert predictor.model.predict.call_count == 2, "Unsaved weights should not be served from the cache."
+    backtester.run(df)
+    assert predictor.model.predict.call_count == 3, "Results for unsaved weights should not be cached."
+
+
+def test_no_look_ahead_and_fold_invariance(predictor, tmp_path):
+    # Predicting the top of the scaled range returns the running max of each window's history.
+    predictor.model = MagicMock()
+    predictor.model.predict.side_effect = lambda X, **kwargs: np.ones((X.shape[0], predictor.forecast_steps))
+    predictor.model_path = str(tmp_path / "missing.h5")
+    closes = np.linspace(1.0, 2.0, 150)
+    closes[-1] = 100.0
+    df = pd.DataFrame({'close': closes})
+
+    X, targets = make_windows(closes, predictor.input_steps, predictor.forecast_steps)
+    first = Backtester(predictor).run(df, folds=1, use_cache=False)
+    expected_mae = np.abs(X.max(axis=1)[:, None] - targets).mean(axis=0)
+    assert np.allclose(first['mae'], expected_mae), "Windows should only be scaled on data up to their last input."
+    second = Backtester(predictor).run(df, folds=5, use_cache=False)
+    assert np.allclose(first['mae'], second['mae']), "Metrics should not depend on the number of folds."
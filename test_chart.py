@@ -0,0 +1,44 @@
+# tests/test_chart.py
+
+import numpy as np
+from app.gui.chart import lttb, StreamingDecimator
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(10000, dtype=float)
+    y = np.sin(x / 500)
+    y[5000] = 10.0
+    dx, dy = lttb(x, y, 200)
+    assert len(dx) == 200, "Output should have the requested number of points."
+    assert dx[0] == 0 and dx[-1] == 9999, "First and last points should be kept."
+    assert dy.max() == 10.0, "Spikes should survive downsampling."
+
+
+def test_streaming_decimator_bounded():
+    decimator = StreamingDecimator(threshold=100)
+    x = np.arange(50000, dtype=float)
+    y = np.cos(x / 1000)
+    for start in range(0, len(x), 1000):
+        decimator.extend(x[start:start + 1000], y[start:start + 1000])
+    decimator.extend(x[:10], y[:10])  # Already seen points are ignored.
+    px, py = decimator.points()
+    assert len(px) < 500, "Output should stay bounded as history grows."
+    assert np.all(np.diff(px) > 0), "Output should stay ordered in time."
+    assert px[-1] == 49999, "Latest point should always be shown."
+
+
+def test_streaming_decimator_bulk_load():
+    decimator = StreamingDecimator(threshold=2000)
+    x = np.arange(1_000_000, dtype=float) * 3600
+    y = np.sin(x / 3.6e7)
+    y[500_000] = 5.0
+    decimator.extend(x, y)
+    px, py = decimator.points()
+    assert len(px) <= 2000 + 2000 // 10 + 2, "A large first load should be decimated to the budget."
+    assert np.all(np.diff(px) > 0), "Output should stay ordered in time."
+    assert py.max() == 5.0, "Spikes should survive the bulk pass."
+    assert px[-1] == x[-1], "Latest point should always be shown."
+    assert decimator.interval() == 3600, "The raw candle interval should survive decimation."
+
+    decimator.extend(x[-1:] + 3600 * np.arange(1, 100), np.zeros(99))
+    assert decimator.points()[0][-1] == x[-1] + 3600 * 99, "Later increments should keep streaming."
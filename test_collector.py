@@ -45,3 +45,20 @@ async def test_collect_all_data(collector):
     assert 'coinbasepro_BTC_USD' in data, "Data should include coinbasepro_BTC_USD."
     assert len(data['binance_BTC_USD']) == 1, "Binance data should have one entry."
     assert len(data['coinbasepro_BTC_USD']) == 1, "CoinbasePro data should have one entry."
+
+
+@pytest.mark.asyncio
+async def test_fetch_data_since_paginates(collector):
+    import time
+    hour = 60 * 60 * 1000
+    now = int(time.time() * 1000) // hour * hour
+    candles = [[now - i * hour, 1, 2, 0.5, 1.5, 10] for i in range(10, -1, -1)]
+
+    async def fetch_ohlcv(symbol, timeframe, since):
+        return [c for c in candles if c[0] >= since][:4]
+
+    collector.exchanges = {'binance': AsyncMock()}
+    collector.exchanges['binance'].fetch_ohlcv.side_effect = fetch_ohlcv
+    data = await collector.fetch_data('binance', 'BTC/USD', since=candles[0][0])
+    assert data == candles, "Pages should be fetched until the latest candle."
+    assert collector.exchanges['binance'].fetch_ohlcv.call_count == 3, "Fetching should stop at the latest candle."
@@ -0,0 +1,29 @@
+# tests/test_export.py
+
+import json
+import pytest
+from app.api.export import encode_json, encode_ndjson, check_format
+
+CHUNKS = [
+    {'key': ['binance_BTC_USD', 'binance_BTC_USD'], 'timestamp': [0, 3600000], 'close': [101.0, 102.0]},
+    {'key': ['binance_ETH_USD'], 'timestamp': [0], 'close': [11.0]},
+]
+
+
+def test_encode_json():
+    body = b''.join(encode_json(iter(CHUNKS)))
+    rows = json.loads(body)
+    assert len(rows) == 3, "All chunks should be combined into one array."
+    assert rows[2] == {'key': 'binance_ETH_USD', 'timestamp': 0, 'close': 11.0}, "Rows should be column-keyed objects."
+    assert json.loads(b''.join(encode_json(iter([{'key': []}])))) == [], "Empty exports should be an empty array."
+
+
+def test_encode_ndjson():
+    lines = b''.join(encode_ndjson(iter(CHUNKS))).splitlines()
+    assert len(lines) == 3, "Each row should be one line."
+    assert json.loads(lines[0])['close'] == 101.0, "Lines should be JSON objects."
+
+
+def test_check_format_rejects_unknown():
+    with pytest.raises(ValueError):
+        check_format('csv')
@@ -0,0 +1,55 @@
+# tests/test_history.py
+
+import pytest
+from app.data.history import HistoryStore
+
+HOUR = 60 * 60 * 1000
+
+
+@pytest.fixture
+def history(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    store.add_candles({
+        'binance_BTC_USD': [[i * HOUR, 100, 102, 99, 101, 10] for i in range(25)],
+        'binance_ETH_USD': [[i * HOUR, 10, 12, 9, 11, 5] for i in range(5)],
+    }, '1h')
+    return store
+
+
+def test_iter_chunks_paginates(history):
+    chunks = list(history.iter_chunks('candles', '1h', chunk_size=10))
+    assert [len(chunk['timestamp']) for chunk in chunks] == [10, 10, 10], "All 30 candles should be paged in chunks."
+    timestamps = [ts for chunk in chunks for ts in chunk['timestamp']]
+    assert len(set(zip(sum((c['key'] for c in chunks), []), timestamps))) == 30, "Pages should not overlap."
+
+
+def test_iter_chunks_filters(history):
+    chunks = list(history.iter_chunks('candles', '1h', keys=['binance_BTC_USD'], start=5 * HOUR, end=10 * HOUR))
+    assert chunks[0]['timestamp'] == [i * HOUR for i in range(5, 10)], "Key and time-range filters should apply."
+    assert set(chunks[0]['key']) == {'binance_BTC_USD'}, "Only the requested key should be returned."
+
+
+def test_iter_chunks_filters_key_prefix(history):
+    history.add_candles({'coinbasepro_BTC_USD': [[0, 100, 102, 99, 101, 10]]}, '1h')
+    (chunk,) = history.iter_chunks('candles', '1h', key_prefix='binance_')
+    assert set(chunk['key']) == {'binance_BTC_USD', 'binance_ETH_USD'}, "Only keys of the requested source should be returned."
+    (chunk,) = history.iter_chunks('candles', '1h', key_prefix='coinbasepro_')
+    assert chunk['key'] == ['coinbasepro_BTC_USD'], "Other sources should be excluded."
+
+
+def test_add_candles_writes_only_outside_stored_range(history):
+    history.add_candles({'binance_BTC_USD': [[i * HOUR, 200, 202, 199, 201, 20] for i in range(-2, 27)]}, '1h')
+    (chunk,) = history.iter_chunks('candles', '1h', keys=['binance_BTC_USD'])
+    closes = dict(zip(chunk['timestamp'], chunk['close']))
+    assert len(closes) == 29, "Backfilled and newer candles should be added."
+    assert closes[10 * HOUR] == 101, "Candles inside the stored range should not be rewritten."
+    assert closes[24 * HOUR] == 201 and closes[26 * HOUR] == 201, "The stored tail and newer candles should be written."
+    assert closes[-2 * HOUR] == 201, "Candles older than the stored head should be backfilled."
+
+
+def test_predictions_round_trip(history):
+    history.add_prediction('binance_BTC_USD', '4h', 24 * HOUR, [101.0, 102.0, 103.0])
+    (chunk,) = history.iter_chunks('predictions', '4h')
+    assert chunk['step'] == [1, 2, 3], "Every forecast step should be stored."
+    assert chunk['value'] == [101.0, 102.0, 103.0], "Forecast values should be stored."
+    assert list(history.iter_chunks('predictions', '1d')) == [{column: [] for column in chunk}], "Empty exports should yield one empty chunk."
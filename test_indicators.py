@@ -0,0 +1,50 @@
+# tests/test_indicators.py
+
+import pytest
+import numpy as np
+import pandas as pd
+from app.data.indicators import IndicatorPlan, stack_frames, recursive_smooth, DEFAULT_FEATURE_SPEC
+
+
+def make_frame(length: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(size=length))
+    return pd.DataFrame({
+        'open': close, 'high': close + 1, 'low': close - 1, 'close': close, 'volume': rng.random(length) + 1
+    })
+
+
+def test_stack_frames_right_aligns():
+    frames = {'a': make_frame(5, 0), 'b': make_frame(3, 1)}
+    arrays = stack_frames(frames, ['close'])
+    assert arrays['close'].shape == (2, 5), "Arrays should be symbols x longest series."
+    assert np.isnan(arrays['close'][1, :2]).all(), "Shorter series should be NaN-padded on the left."
+
+
+def test_compute_matches_pandas():
+    frames = {'a': make_frame(120, 0), 'b': make_frame(80, 1)}
+    arrays = stack_frames(frames, ['high', 'low', 'close', 'volume'])
+    features = IndicatorPlan(DEFAULT_FEATURE_SPEC).compute(**arrays)
+    close = frames['b']['close']
+    padding = 120 - 80
+    assert np.allclose(features['ma_20'][1, padding:], close.rolling(20).mean(), equal_nan=True), "MA should match pandas."
+    assert np.allclose(features['ema_10'][1, padding:], close.ewm(span=10, adjust=False).mean()), "EMA should match pandas."
+    upper = close.rolling(20).mean() + 2 * close.rolling(20).std()
+    assert np.allclose(features['bb_upper_20'][1, padding:], upper, equal_nan=True), "Bollinger band should match pandas."
+
+
+def test_recursive_smooth_handles_padding_and_gaps():
+    values = make_frame(50, 2)['close'].to_numpy()
+    inputs = np.stack([np.stack([values, values])] * 2)
+    inputs[:, 1, :10] = np.nan
+    inputs[:, 0, 30] = np.nan
+    smoothed = recursive_smooth(inputs, np.array([0.2, 0.5]))
+    expected = pd.Series(values[10:]).ewm(alpha=0.5, adjust=False).mean()
+    assert np.allclose(smoothed[1, 1, 10:], expected), "Padded series should start at their first value."
+    assert np.isnan(smoothed[:, 1, :10]).all() and np.isnan(smoothed[:, 0, 30]).all(), "Missing inputs should stay NaN."
+    assert np.allclose(smoothed[0, 0, :30], pd.Series(values[:30]).ewm(alpha=0.2, adjust=False).mean()), "Each series should use its own alpha."
+
+
+def test_unknown_indicator_rejected():
+    with pytest.raises(ValueError):
+        IndicatorPlan({'stochastic': [14]})
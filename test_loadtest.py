@@ -0,0 +1,63 @@
+# tests/test_loadtest.py
+
+import socket
+import pytest
+from fastapi import FastAPI, Header, HTTPException
+from app.utils.loadtest import LOADTEST_API_KEY, FakeExchange, parse_mix, run_load, start_server, summarize
+from app.utils.timing import StageTimer, parse_server_timing
+
+
+@pytest.mark.asyncio
+async def test_fake_exchange_candles():
+    exchange = FakeExchange('binance', latency=0, candles=100)
+    candles = await exchange.fetch_ohlcv('BTC/USD', timeframe='1h')
+    assert len(candles) == 100, "Fake exchange should return the configured number of candles."
+    assert all(c[2] >= max(c[1], c[4]) and c[3] <= min(c[1], c[4]) for c in candles), "Candles should be valid OHLC."
+    assert candles == await exchange.fetch_ohlcv('BTC/USD', timeframe='1h'), "Candles should be deterministic."
+
+
+def test_parse_mix():
+    assert parse_mix("predict=8, webhook=2,intervals") == {'predict': 8.0, 'webhook': 2.0, 'intervals': 1.0}
+
+
+def test_server_timing_round_trip():
+    timer = StageTimer()
+    with timer.stage("collect"):
+        pass
+    with timer.stage("inference"):
+        pass
+    assert set(parse_server_timing(timer.header())) == {"collect", "inference"}, "All stages should be reported."
+
+
+def test_summarize():
+    samples = {
+        'predict': {'latencies': [10.0, 20.0, 30.0], 'errors': 1, 'statuses': {200: 2, 500: 1},
+                    'stages': {'inference': [1.0, 2.0]}},
+    }
+    report = summarize(samples, elapsed=2.0)
+    assert report['predict']['requests'] == 3, "Every response should be counted."
+    assert report['predict']['latency_ms']['p50'] == 20.0, "Median latency should be reported."
+    assert report['total']['throughput'] == 1.5, "Throughput should be requests per second."
+    assert report['predict']['stages_ms']['inference']['max'] == 2.0, "Server-side stages should be summarized."
+
+
+@pytest.mark.asyncio
+async def test_run_load_sends_api_key():
+    app = FastAPI()
+
+    @app.post("/api/predict/{symbol}")
+    async def predict(symbol: str, api_key: str = Header(None)):
+        if api_key != LOADTEST_API_KEY:
+            raise HTTPException(status_code=403, detail="Invalid API Key")
+        return {"predictions": [1.0, 2.0, 3.0]}
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = start_server(app, port, timeout=10)
+    try:
+        report = await run_load(f"http://127.0.0.1:{port}", {"predict": 1}, concurrency=2, duration=0.3, warmup=1)
+    finally:
+        server.should_exit = True
+    assert report['predict']['requests'] > 0, "Requests should reach the server."
+    assert report['predict']['statuses'] == {'200': report['predict']['requests']}, "The API key should be accepted."
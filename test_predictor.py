@@ -56,3 +56,84 @@ def test_save_and_load_model(predictor, tmp_path):
         mock_load.return_value = "loaded_mock_model"
         predictor.load_model(str(model_path))
         assert predictor.model == "loaded_mock_model", "Model should be loaded correctly."
+
+
+def test_load_model_bumps_version(predictor, tmp_path):
+    model_path = tmp_path / "model.h5"
+    model_path.touch()
+    version = predictor.model_version
+    with patch('app.models.predictor.load_model', return_value="reloaded_mock_model"):
+        predictor.load_model(str(model_path))
+    assert predictor.model_version == version + 1, "Reloading weights should change the model version."
+
+
+def test_fine_tune_uses_new_windows(predictor, tmp_path):
+    import pandas as pd
+    from unittest.mock import MagicMock
+    from sklearn.preprocessing import MinMaxScaler
+    index = pd.date_range("2021-01-01", periods=100, freq="h")
+    df = pd.DataFrame({'close': np.random.rand(100)}, index=index)
+    predictor.model = MagicMock()
+    predictor.model.fit.return_value.history = {'loss': [0.1]}
+    predictor.training_scalers = {'binance_BTC_USD': MinMaxScaler().fit(df[['close']].values)}
+    predictor.watermarks = {'binance_BTC_USD': str(index[89])}
+    predictor.scaler = MinMaxScaler().fit(np.array([[1000.0], [2000.0]]))  # Refit by an unrelated predict.
+
+    loss = predictor.fine_tune(df, key='binance_BTC_USD', replay_size=5, checkpoint_dir=str(tmp_path))
+    X, y = predictor.model.fit.call_args[0]
+    assert loss == 0.1, "Fine-tuning should return the final loss."
+    assert 0 <= X.min() and X.max() <= 1, "Windows should be scaled with the key's training scaler."
+    assert X.shape == (15, predictor.input_steps, 1), "Only new windows plus the replay sample should be trained on."
+    assert y.shape == (15, predictor.forecast_steps), "Targets should match the selected windows."
+    assert predictor.watermarks['binance_BTC_USD'] == str(index[-1]), "Watermark should advance to the latest candle."
+    assert predictor.fine_tune(df, key='binance_BTC_USD') is None, "No new windows should skip fine-tuning."
+
+
+def test_save_and_load_state(predictor, tmp_path):
+    from sklearn.preprocessing import MinMaxScaler
+    model_path = str(tmp_path / "model.h5")
+    predictor.training_scalers = {
+        'binance_BTC_USD': MinMaxScaler().fit(np.array([[10.0], [20.0]])),
+        'binance_ETH_USD': MinMaxScaler().fit(np.array([[1.0], [3.0]])),
+    }
+    predictor.watermarks = {'binance_BTC_USD': "2021-01-01 00:00:00", 'binance_ETH_USD': "2021-01-02 00:00:00"}
+    predictor.save_state(model_path)
+
+    predictor.training_scalers, predictor.watermarks = {}, {}
+    assert predictor.load_state(model_path), "Saved state should be found next to the model."
+    assert predictor.training_scalers['binance_BTC_USD'].transform([[15.0]])[0, 0] == 0.5, "Each key's scaler should be restored."
+    assert predictor.training_scalers['binance_ETH_USD'].transform([[2.0]])[0, 0] == 0.5, "Each key's scaler should be restored."
+    assert predictor.watermarks['binance_ETH_USD'] == "2021-01-02 00:00:00", "Watermarks should be restored."
+
+
+def test_predict_intervals_single_batched_pass(predictor):
+    from unittest.mock import MagicMock
+    from sklearn.preprocessing import MinMaxScaler
+    rng = np.random.default_rng(0)
+    predictor.model = MagicMock(layers=[])
+    predictor.model.side_effect = lambda X, training: rng.random((X.shape[0], predictor.forecast_steps))
+    predictor.scaler = MinMaxScaler().fit(np.array([[0.0], [100.0]]))
+    input_data = np.random.rand(2, predictor.input_steps, 1)
+
+    intervals = predictor.predict_intervals(input_data, samples=50)
+    predictor.model.assert_called_once()
+    batch = predictor.model.call_args[0][0]
+    assert batch.shape == (100, predictor.input_steps, 1), "All samples should be stacked into one batch."
+    assert predictor.model.call_args[1] == {'training': True}, "Dropout should be active while sampling."
+    assert set(intervals) == {0.05, 0.5, 0.95}, "Default quantiles should be returned."
+    assert intervals[0.05].shape == (2, predictor.forecast_steps), "Quantiles should be per input row and step."
+    assert np.all(intervals[0.05] <= intervals[0.95]), "Lower quantile should not exceed the upper one."
+    assert intervals[0.95].max() > 1.0, "Quantiles should be returned in price space."
+
+
+def test_prepared_scaler_isolated_from_later_calls(predictor):
+    import pandas as pd
+    from unittest.mock import MagicMock
+    predictor.model = MagicMock(layers=[])
+    predictor.model.side_effect = lambda X, training: np.full((X.shape[0], predictor.forecast_steps), 0.5)
+    btc = predictor.prepare_data(pd.DataFrame({'close': np.linspace(100.0, 130.0, 100)}))
+    predictor.prepare_data(pd.DataFrame({'close': np.linspace(1000.0, 1300.0, 100)}))  # A concurrent request.
+
+    input_data = btc['X'][-1:]
+    intervals = predictor.predict_intervals(input_data, samples=10, scaler=btc['scaler'])
+    assert np.allclose(intervals[0.5], 115.0), "Intervals should be mapped back with the request's own scaler."
@@ -34,3 +34,33 @@ def test_feature_engineering(processor):
     df = engineered['binance_BTC_USD']
     assert 'ma_0' in df.columns, "DataFrame should contain 'ma_0' column."
     assert 'ema_0' in df.columns, "DataFrame should contain 'ema_0' column."
+
+
+def test_consolidate(processor):
+    raw_data = {
+        'binance_BTC_USD': [
+            [1609459200000, 29000, 29500, 28900, 29400, 100],
+            [1609462800000, 29400, 29600, 29300, 29500, 100]
+        ],
+        'coinbasepro_BTC_USD': [
+            [1609459200000, 29200, 29700, 28800, 29600, 300]
+        ]
+    }
+    consolidated = processor.consolidate(raw_data)
+    assert 'consolidated_BTC_USD' in consolidated, "Consolidated data should include consolidated_BTC_USD."
+    df = consolidated['consolidated_BTC_USD']
+    assert len(df) == 2, "Bars missing on one exchange should still be kept."
+    assert df['close'].iloc[0] == 29550, "Close should be volume-weighted across exchanges."
+    assert df['high'].iloc[0] == 29700, "High should be the maximum across exchanges."
+    assert df['low'].iloc[0] == 28800, "Low should be the minimum across exchanges."
+    assert df['volume'].iloc[0] == 400, "Volume should be summed across exchanges."
+    assert df['close'].iloc[1] == 29500, "Single-exchange bars should pass through unchanged."
+
+
+def test_feature_engineering_with_spec(processor):
+    close = pd.Series(range(100), dtype=float)
+    df = pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1, 'close': close, 'volume': 1.0})
+    engineered = processor.feature_engineering({'binance_BTC_USD': df}, spec={'ma': [5], 'rsi': [14]})
+    result = engineered['binance_BTC_USD']
+    assert 'ma_5' in result.columns and 'rsi_14' in result.columns, "Spec features should be added."
+    assert list(df.columns) == ['open', 'high', 'low', 'close', 'volume'], "Input DataFrame should not be mutated."
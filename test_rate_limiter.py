@@ -0,0 +1,50 @@
+# tests/test_rate_limiter.py
+
+import pytest
+from app.utils.rate_limiter import RateLimiter, key_tiers_from_config
+
+TIERS = {
+    'free': {'rate': 1.0, 'burst': 2, 'monthly_quota': 100},
+    'tiny': {'rate': 100.0, 'burst': 100, 'monthly_quota': 3},
+}
+
+
+@pytest.fixture
+def rate_limiter(tmp_path):
+    return RateLimiter(key_tiers={'quota_key': 'tiny'}, tiers=TIERS, path=str(tmp_path / "usage.db"))
+
+
+def test_burst_then_limited(rate_limiter):
+    assert rate_limiter.check('test_api_key')[0], "First request should be allowed."
+    assert rate_limiter.check('test_api_key')[0], "Burst should allow a second request."
+    allowed, retry_after = rate_limiter.check('test_api_key')
+    assert not allowed, "Requests beyond the burst should be limited."
+    assert 0 < retry_after <= 1.0, "Retry-After should reflect the refill rate."
+
+
+def test_monthly_quota(rate_limiter):
+    for _ in range(3):
+        assert rate_limiter.check('quota_key')[0], "Requests within quota should be allowed."
+    allowed, retry_after = rate_limiter.check('quota_key')
+    assert not allowed, "Requests beyond the monthly quota should be rejected."
+    assert retry_after > 0, "Retry-After should point to the next month."
+
+
+def test_usage_flushed_and_reloaded(rate_limiter, tmp_path):
+    rate_limiter.check('quota_key')
+    rate_limiter.check('quota_key')
+    rate_limiter.flush()
+    reloaded = RateLimiter(key_tiers={'quota_key': 'tiny'}, tiers=TIERS, path=str(tmp_path / "usage.db"))
+    assert reloaded.usage['quota_key'] == 2, "Usage should survive a restart."
+    assert reloaded.check('quota_key')[0] and not reloaded.check('quota_key')[0], "Reloaded usage should count against the quota."
+
+
+def test_key_tiers_loaded_from_config(config, tmp_path):
+    rate_limiter = RateLimiter(key_tiers=key_tiers_from_config(config), path=str(tmp_path / "usage.db"))
+    assert rate_limiter.tier_name('test_api_key') == 'pro', "Configured keys should get their tier."
+    assert rate_limiter.tier_name('unknown_key') == 'free', "Other keys should get the default tier."
+
+
+def test_unknown_tier_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        RateLimiter(key_tiers={'test_api_key': 'enterprise'}, path=str(tmp_path / "usage.db"))
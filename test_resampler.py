@@ -0,0 +1,72 @@
+# tests/test_resampler.py
+
+import pytest
+import numpy as np
+from app.data.resampler import DataResampler, aggregate_ohlcv
+
+HOUR = 60 * 60 * 1000
+
+
+def make_candles(start: int, count: int):
+    return [[(start + i) * HOUR, 100 + i, 102 + i, 99 + i, 101 + i, 10] for i in range(count)]
+
+
+def test_aggregate_ohlcv():
+    candles = np.array(make_candles(0, 8), dtype=float)
+    resampled = aggregate_ohlcv(candles, '4h')
+    assert resampled.shape == (2, 6), "Eight hourly candles should form two 4h candles."
+    assert resampled[0].tolist() == [0, 100, 105, 99, 104, 40], "Bucket should keep first open, last close, extremes and total volume."
+
+
+def test_incremental_update_matches_full_resample():
+    candles = make_candles(0, 50)
+    resampler = DataResampler('1h')
+    resampler.update({'binance_BTC_USD': candles[:21]})
+    # The overlapping candle simulates a refreshed, previously open base candle.
+    resampler.update({'binance_BTC_USD': candles[20:]})
+    for timeframe in ['1h', '4h', '1d']:
+        expected = aggregate_ohlcv(np.array(candles, dtype=float), timeframe).tolist()
+        assert resampler.get(timeframe)['binance_BTC_USD'] == expected, f"{timeframe} candles should match a full resample."
+
+
+def test_finer_timeframe_rejected():
+    resampler = DataResampler('1h')
+    with pytest.raises(ValueError):
+        resampler.get('5m')
+
+
+def test_backfill_and_stale_candles():
+    candles = make_candles(0, 50)
+    resampler = DataResampler('1h')
+    resampler.update({'binance_BTC_USD': candles[30:]})
+    # Already stored, closed candles are ignored; older history is merged in front.
+    resampler.update({'binance_BTC_USD': candles[35:45]})
+    resampler.update({'binance_BTC_USD': candles[:32]})
+    expected = aggregate_ohlcv(np.array(candles, dtype=float), '4h').tolist()
+    assert resampler.get('4h')['binance_BTC_USD'] == expected, "Backfilled history should be merged in order."
+
+
+def test_fetch_since():
+    resampler = DataResampler('1h')
+    now = 100 * 24 * HOUR
+    assert resampler.fetch_since('1d', 10, now=now) == 90 * 24 * HOUR, "Empty resampler should backfill the full range."
+    resampler.update({'binance_BTC_USD': make_candles(90 * 24, 240)}, since=90 * 24 * HOUR)
+    assert resampler.fetch_since('1d', 10, now=now) == (90 * 24 + 239) * HOUR, "Covered range should fetch from the tail."
+    assert resampler.fetch_since('1d', 20, now=now) == 80 * 24 * HOUR, "Longer ranges should trigger a backfill."
+
+
+def test_history_trimmed_to_requested_range():
+    resampler = DataResampler('1h')
+    now = 100 * 24 * HOUR
+    since = resampler.fetch_since('4h', 10, now=now)
+    candles = make_candles(since // HOUR, 40)
+    resampler.update({'binance_BTC_USD': candles}, since=since)
+    # A long uptime keeps appending candles past the requested range.
+    for start in range(40, 400, 20):
+        resampler.update({'binance_BTC_USD': make_candles(since // HOUR + start, 20)})
+    stored = resampler.base['binance_BTC_USD']
+    assert len(stored) <= 40 + 24, "Base candles older than the requested range should be dropped."
+    assert stored[0, 0] % (24 * HOUR) == 0, "Trimming should cut on a whole coarsest bucket."
+    assert resampler.get('4h')['binance_BTC_USD'][0][0] == stored[0, 0], "Derived series should be trimmed with the base."
+    assert resampler.get('4h', bars=10)['binance_BTC_USD'][-1][0] == (since // HOUR + 396) * HOUR, "Latest candle should be kept."
+    assert len(resampler.get('1h', bars=10)['binance_BTC_USD']) == 10, "Only the requested bars should be returned."
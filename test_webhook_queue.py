@@ -0,0 +1,66 @@
+# tests/test_webhook_queue.py
+
+import asyncio
+import sqlite3
+import pytest
+from unittest.mock import MagicMock
+from app.utils.webhook_queue import WebhookQueue, WebhookWorker
+
+EVENT = {"id": "evt_123", "type": "checkout.session.completed", "data": {"object": {"customer": "cust_123"}}}
+
+
+@pytest.fixture
+def webhook_queue(tmp_path):
+    queue = WebhookQueue(str(tmp_path / "webhooks.db"), max_attempts=2, retry_delay=0)
+    yield queue
+    queue.close()
+
+
+def test_enqueue_deduplicates(webhook_queue):
+    assert webhook_queue.enqueue(EVENT), "First delivery should be queued."
+    assert not webhook_queue.enqueue(EVENT), "Retried delivery should be ignored."
+    assert len(webhook_queue.due()) == 1, "Only one event should be pending."
+
+
+@pytest.mark.asyncio
+async def test_worker_processes_events(webhook_queue):
+    handler = MagicMock()
+    webhook_queue.enqueue(EVENT)
+    processed = await WebhookWorker(webhook_queue, handler).process_due()
+    assert processed == 1, "Worker should process the pending event."
+    handler.assert_called_once_with(EVENT)
+    assert webhook_queue.status("evt_123") == "done", "Event should be marked done."
+
+
+@pytest.mark.asyncio
+async def test_worker_retries_then_fails(webhook_queue):
+    handler = MagicMock(side_effect=Exception("config write failed"))
+    webhook_queue.enqueue(EVENT)
+    worker = WebhookWorker(webhook_queue, handler)
+    await worker.process_due()
+    assert webhook_queue.status("evt_123") == "pending", "Failed event should be retried."
+    await worker.process_due()
+    assert webhook_queue.status("evt_123") == "failed", "Event should fail after max attempts."
+    assert handler.call_count == 2, "Handler should be called once per attempt."
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_storage_errors(webhook_queue):
+    handler = MagicMock()
+    webhook_queue.enqueue(EVENT)
+    errors = [sqlite3.OperationalError("database is locked")]
+    due = webhook_queue.due
+
+    def flaky_due():
+        if errors:
+            raise errors.pop()
+        return due()
+
+    webhook_queue.due = flaky_due
+    worker = WebhookWorker(webhook_queue, handler, poll_interval=0.01)
+    worker.start()
+    await asyncio.sleep(0.1)
+    assert not worker.task.done(), "Worker should keep running after a storage error."
+    await worker.stop()
+    handler.assert_called_once_with(EVENT)
+    assert webhook_queue.status("evt_123") == "done", "Event should be processed once storage recovers."
@@ -0,0 +1,34 @@
+# app/utils/timing.py
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class StageTimer:
+    """Collects per-stage wall-clock durations of a request for the ``Server-Timing`` header."""
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def header(self) -> str:
+        return ", ".join(f"{name};dur={duration:.2f}" for name, duration in self.durations.items())
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    """Parse a ``Server-Timing`` header into ``{stage: milliseconds}``."""
+    durations = {}
+    for entry in filter(None, (part.strip() for part in header.split(","))):
+        name, *params = [field.strip() for field in entry.split(";")]
+        for param in params:
+            if param.startswith("dur="):
+                durations[name] = float(param[4:])
+    return durations
@@ -5,12 +5,13 @@
 
 from PyQt5.QtWidgets import QMainWindow, QPushButton, QLineEdit, QLabel, QMessageBox
 from PyQt5.QtCore import QRect
+from app.gui.chart import PriceChart
 
 
 class Ui_MainWindow(QMainWindow):
     def setupUi(self, MainWindow):
         MainWindow.setWindowTitle("Crypto Price Predictor")
-        MainWindow.setGeometry(100, 100, 600, 400)
+        MainWindow.setGeometry(100, 100, 600, 450)
 
         self.symbolInput = QLineEdit(MainWindow)
         self.symbolInput.setGeometry(QRect(50, 50, 200, 40))
@@ -24,3 +25,6 @@ class Ui_MainWindow(QMainWindow):
 
         self.statusLabel = QLabel("Status: Idle", MainWindow)
         self.statusLabel.setGeometry(QRect(50, 100, 450, 30))
+
+        self.priceChart = PriceChart(MainWindow)
+        self.priceChart.setGeometry(QRect(50, 140, 500, 280))
@@ -0,0 +1,129 @@
+# app/utils/webhook_queue.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class WebhookQueue:
+    """Durable SQLite (WAL) queue of webhook events, deduplicated by event ID."""
+
+    def __init__(self, path: str = "app/data/webhook_queue.db", max_attempts: int = 5, retry_delay: float = 5.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            " id TEXT PRIMARY KEY, type TEXT, payload TEXT, status TEXT DEFAULT 'pending',"
+            " attempts INTEGER DEFAULT 0, next_attempt REAL DEFAULT 0, last_error TEXT, created_at REAL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS events_due ON events (status, next_attempt)")
+
+    @staticmethod
+    def event_id(event: dict) -> str:
+        return event.get('id') or hashlib.sha256(json.dumps(event, sort_keys=True).encode()).hexdigest()
+
+    def enqueue(self, event: dict) -> bool:
+        """Persist ``event``; returns ``False`` if an event with the same ID was already queued."""
+        with self.lock:
+            cursor = self.connection.execute(
+                "INSERT OR IGNORE INTO events (id, type, payload, created_at) VALUES (?, ?, ?, ?)",
+                (self.event_id(event), event.get('type'), json.dumps(event), time.time()),
+            )
+        return cursor.rowcount == 1
+
+    def due(self, limit: int = 10) -> List[dict]:
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT id, payload FROM events WHERE status = 'pending' AND next_attempt <= ?"
+                " ORDER BY created_at LIMIT ?",
+                (time.time(), limit),
+            ).fetchall()
+        return [dict(json.loads(payload), id=event_id) for event_id, payload in rows]
+
+    def mark_done(self, event_id: str):
+        with self.lock:
+            self.connection.execute("UPDATE events SET status = 'done', last_error = NULL WHERE id = ?", (event_id,))
+
+    def mark_failed(self, event_id: str, error: str):
+        """Schedule a retry with exponential backoff, or give up after ``max_attempts``."""
+        with self.lock:
+            (attempts,) = self.connection.execute(
+                "SELECT attempts FROM events WHERE id = ?", (event_id,)
+            ).fetchone()
+            attempts += 1
+            status = 'failed' if attempts >= self.max_attempts else 'pending'
+            next_attempt = time.time() + self.retry_delay * 2 ** (attempts - 1)
+            self.connection.execute(
+                "UPDATE events SET status = ?, attempts = ?, next_attempt = ?, last_error = ? WHERE id = ?",
+                (status, attempts, next_attempt, error, event_id),
+            )
+        if status == 'failed':
+            logging.error(f"Webhook event {event_id} failed permanently after {attempts} attempts: {error}")
+
+    def status(self, event_id: str) -> Optional[str]:
+        with self.lock:
+            row = self.connection.execute("SELECT status FROM events WHERE id = ?", (event_id,)).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class WebhookWorker:
+    """Background task that drains a ``WebhookQueue`` through ``handler`` off the event loop."""
+
+    def __init__(self, queue: WebhookQueue, handler: Callable[[dict], None], poll_interval: float = 1.0):
+        self.queue = queue
+        self.handler = handler
+        self.poll_interval = poll_interval
+        self.task: Optional[asyncio.Task] = None
+
+    async def process_due(self) -> int:
+        events = self.queue.due()
+        for event in events:
+            try:
+                await asyncio.to_thread(self.handler, event)
+                self.queue.mark_done(event['id'])
+            except Exception as e:
+                logging.error(f"Error processing webhook event {event['id']}: {e}")
+                self.queue.mark_failed(event['id'], str(e))
+        return len(events)
+
+    async def run(self):
+        while True:
+            # A storage error (e.g. a locked database) must not end the worker; retry after a poll.
+            try:
+                processed = await self.process_due()
+            except Exception as e:
+                logging.error(f"Error draining webhook queue: {e}")
+                processed = 0
+            if not processed:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self.run())
+        logging.info("Webhook worker started.")
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        logging.info("Webhook worker stopped.")